@@ -0,0 +1,153 @@
+from contextlib import asynccontextmanager
+from typing import List
+
+import pandas as pd
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field, create_model
+
+import warmup
+from utils.batching import registry_batchers
+from utils.combined import MODELS, assess
+from utils.features import COMBINED_FEATURE_ORDER, FEATURE_ORDERS, FEATURES, error_messages, validate
+from utils.metrics import CONTENT_TYPE, metrics
+from utils.model_registry import ModelRegistry
+from utils.risk import assess_risk
+
+
+# 워커 프로세스마다 하나의 레지스트리 (모델은 프로세스당 한 번만 로드)
+registry = ModelRegistry()
+
+# 동시에 들어온 단일 환자 요청을 하나의 predict_proba 호출로 묶음
+batchers = {}
+for _model_name in FEATURE_ORDERS:
+    batchers.update(registry_batchers(registry, _model_name))
+
+
+def _patient_model(name, feature_order):
+    fields = {}
+    for feature in feature_order:
+        spec = FEATURES[feature]
+        description = f"{spec.display_name}: {spec.range_text}"
+        fields[feature] = (int if spec.choices else float, Field(..., description=description))
+    return create_model(name, **fields)
+
+
+CAAPatient = _patient_model("CAAPatient", FEATURE_ORDERS["caa"])
+IVIGPatient = _patient_model("IVIGPatient", FEATURE_ORDERS["ivig"])
+CombinedPatient = _patient_model("CombinedPatient", COMBINED_FEATURE_ORDER)
+
+
+class PredictionResult(BaseModel):
+    probability: float
+    risk_level: str
+    recommendation: str
+
+
+class CombinedResult(BaseModel):
+    caa: PredictionResult
+    ivig: PredictionResult
+
+
+def validated_frame(name, patients, feature_order):
+    """Feature frame of the patient records; raises 422 listing the invalid rows"""
+    with metrics.stage(f"api.{name}.validate"):
+        X = pd.DataFrame([p.model_dump() for p in patients], columns=feature_order)
+        # UI, 일괄 예측과 같은 범위 검사를 목록 전체에 한 번에 적용
+        missing, out_of_range = validate(X, feature_order)
+    if out_of_range.any() or missing.any():
+        messages = error_messages(missing, out_of_range, feature_order)
+        detail = [{"index": int(i), "error": messages[i]} for i in range(len(messages)) if messages[i]]
+        raise HTTPException(status_code=422, detail=detail)
+    return X
+
+
+def predict(model_name, patients):
+    """Score a list of validated patient records in one predict_proba call"""
+    if not patients:
+        return []
+
+    X = validated_frame(model_name, patients, FEATURE_ORDERS[model_name])
+
+    try:
+        with metrics.stage(f"api.{model_name}.predict_proba"):
+            if len(X) == 1:
+                probs = batchers[f"{model_name}_model"](X)[:, 1]
+            else:
+                probs = registry.get(f"{model_name}_model").predict_proba(X)[:, 1]
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=f"Model not available: {e}")
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Prediction timed out, please retry")
+
+    return [assess_risk(model_name, p) for p in probs]
+
+
+def predict_combined(patient):
+    """Score one patient with both models, one after another, from a single input record"""
+    X = validated_frame("combined", [patient], COMBINED_FEATURE_ORDER)
+    try:
+        with metrics.stage("api.combined.predict_proba"):
+            result = assess(registry, X, explain=False)
+        for stage, seconds in result["timings"].items():
+            metrics.observe(f"api.combined.{stage}", seconds)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=f"Model not available: {e}")
+
+    return {name: assess_risk(name, result[f"{name}_model"]["probability"]) for name in MODELS}
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # 첫 요청이 로딩 시간을 부담하지 않도록 워커 시작 시 모델을 미리 로드
+    for model_name in FEATURE_ORDERS:
+        try:
+            registry.get(f"{model_name}_model")
+        except FileNotFoundError:
+            pass
+    # 요청을 받기 전이므로 로드한 모델과 모듈만 GC 검사 대상에서 제외됨
+    warmup.freeze()
+    yield
+
+
+app = FastAPI(title="Kawasaki Disease Prediction API", lifespan=lifespan)
+
+
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "models": registry.stats(),
+        "batchers": {name: b.stats() for name, b in batchers.items()},
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    # 워커 프로세스별 값 (uvicorn --workers 사용 시 스크레이프한 워커의 값)
+    return PlainTextResponse(metrics.render_prometheus(), media_type=CONTENT_TYPE)
+
+
+@app.post("/predict/caa", response_model=PredictionResult)
+def predict_caa(patient: CAAPatient):
+    return predict("caa", [patient])[0]
+
+
+@app.post("/predict/caa/batch", response_model=List[PredictionResult])
+def predict_caa_batch(patients: List[CAAPatient]):
+    return predict("caa", patients)
+
+
+@app.post("/predict/ivig", response_model=PredictionResult)
+def predict_ivig(patient: IVIGPatient):
+    return predict("ivig", [patient])[0]
+
+
+@app.post("/predict/ivig/batch", response_model=List[PredictionResult])
+def predict_ivig_batch(patients: List[IVIGPatient]):
+    return predict("ivig", patients)
+
+
+@app.post("/predict/combined", response_model=CombinedResult)
+def predict_combined_endpoint(patient: CombinedPatient):
+    return predict_combined(patient)
@@ -1,6 +1,10 @@
+import importlib
+import threading
+
 import streamlit as st
-import pickle
-from components import home, caa_prediction, ivig_prediction
+
+import warmup
+from utils.metrics import METRICS_PORT, metrics, serve
 
 st.set_page_config(
     page_title="Kawasaki Disease Prediction System",
@@ -8,42 +12,47 @@ st.set_page_config(
     layout="wide"
 )
 
-def load_models():
-    """Load all models and explainers"""
-    models = {}
-    explainers = {}
-    
-    try:
-        # CAA 모델
-        with open('models/caa_model.pkl', 'rb') as f:
-            models['caa'] = pickle.load(f)
-        with open('models/caa_explainer.pkl', 'rb') as f:
-            explainers['caa'] = pickle.load(f)
-        
-        # IVIG 모델
-        with open('models/ivig_model.pkl', 'rb') as f:
-            models['ivig'] = pickle.load(f)
-        with open('models/ivig_explainer.pkl', 'rb') as f:
-            explainers['ivig'] = pickle.load(f)
-            
-    except FileNotFoundError as e:
-        st.error(f"❌ 파일을 찾을 수 없습니다: {e}")
-        return None, None
-    except Exception as e:
-        st.error(f"❌ 모델 로딩 실패: {str(e)}")
-        return None, None
-    
-    return models, explainers
+# 페이지 모듈은 처음 열 때 import (Home 화면은 shap/pandas 등을 불러오지 않음)
+PAGE_MODULES = {
+    "home": "components.home",
+    "caa": "components.caa_prediction",
+    "ivig": "components.ivig_prediction",
+    "combined": "components.combined_prediction",
+    "batch": "components.batch_prediction",
+    "summary": "components.shap_summary",
+    "admin": "components.admin",
+}
+
+
+def load_page(page):
+    return importlib.import_module(PAGE_MODULES[page])
+
+
+@st.cache_resource
+def start_warmup():
+    """Warm heavy imports, models and job workers once per server process, in the background"""
+    def run():
+        from utils.model_loader import get_job_queue, get_registry
+        queue = get_job_queue()
+        # 워커가 SHAP 을 계산하면 메인 프로세스에서는 explainer 를 만들지 않음
+        warmup.warm(get_registry(), explainers=queue.workers == 0)
+        # 작업 큐 워커 프로세스를 띄우고 모델을 미리 로드
+        queue.start()
+
+    thread = threading.Thread(target=run, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource
+def start_metrics_server(port):
+    """Serve Prometheus metrics of this Streamlit process on ``port``"""
+    return serve(metrics, port)
+
 
 def main():
     st.sidebar.title("Navigation")
     
-    models, explainers = load_models()
-    
-    if models is None or explainers is None:
-        st.error("⚠️ 모델을 로드할 수 없습니다.")
-        st.stop()
-    
     if 'page' not in st.session_state:
         st.session_state.page = "home"
     
@@ -59,6 +68,22 @@ def main():
         st.session_state.page = "ivig"
         st.rerun()
     
+    if st.sidebar.button("Combined Assessment", key="nav_combined"):
+        st.session_state.page = "combined"
+        st.rerun()
+    
+    if st.sidebar.button("Batch Scoring", key="nav_batch"):
+        st.session_state.page = "batch"
+        st.rerun()
+    
+    if st.sidebar.button("SHAP Summary", key="nav_summary"):
+        st.session_state.page = "summary"
+        st.rerun()
+    
+    if st.sidebar.button("Admin", key="nav_admin"):
+        st.session_state.page = "admin"
+        st.rerun()
+    
     st.sidebar.write("---")
     st.sidebar.write("**Current Page**")
     if st.session_state.page == "home":
@@ -67,13 +92,47 @@ def main():
         st.sidebar.info("Coronary Aneurysm Prediction")
     elif st.session_state.page == "ivig":
         st.sidebar.info("IVIG Resistance Prediction")
+    elif st.session_state.page == "combined":
+        st.sidebar.info("Combined CAA + IVIG Assessment")
+    elif st.session_state.page == "batch":
+        st.sidebar.info("Batch Cohort Scoring")
+    elif st.session_state.page == "summary":
+        st.sidebar.info("SHAP Summary")
+    elif st.session_state.page == "admin":
+        st.sidebar.info("Admin")
     
-    if st.session_state.page == "home":
-        home.show()
-    elif st.session_state.page == "caa":
-        caa_prediction.show(models['caa'], explainers['caa'])
-    elif st.session_state.page == "ivig":
-        ivig_prediction.show(models['ivig'], explainers['ivig'])
+    if st.session_state.page in ("caa", "ivig"):
+        from components import shap_charts
+        from utils.model_loader import load_batched
+
+        shap_charts.backend_toggle()
+        model, explainer = load_batched(st.session_state.page)
+        if model is None:
+            st.error("⚠️ 모델을 로드할 수 없습니다.")
+            st.stop()
+        load_page(st.session_state.page).show(model, explainer)
+    elif st.session_state.page == "combined":
+        from components import shap_charts
+        from utils.combined import MODELS
+        from utils.model_loader import load_batched
+
+        shap_charts.backend_toggle()
+        models, explainers = {}, {}
+        for model_name in MODELS:
+            models[model_name], explainers[model_name] = load_batched(model_name)
+            if models[model_name] is None:
+                st.error("⚠️ 모델을 로드할 수 없습니다.")
+                st.stop()
+        load_page("combined").show(models, explainers)
+    else:
+        load_page(st.session_state.page).show()
+    
+    # 첫 화면을 그린 뒤 무거운 모듈과 모델을 미리 로드
+    if warmup.ENABLED:
+        start_warmup()
+
+    if METRICS_PORT:
+        start_metrics_server(int(METRICS_PORT))
 
 if __name__ == "__main__":
     main()
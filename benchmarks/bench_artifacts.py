@@ -0,0 +1,86 @@
+"""Model load time and memory: raw pickle vs packaged artifacts.
+
+Each model is loaded in a fresh Python process (as on a cold worker), so
+the time includes importing the libraries the format needs: unpickling
+the IVIG RandomForest imports sklearn, the compiled forest only needs
+NumPy. Reports the median over ``REPEATS`` processes of load time, RSS
+growth and peak RSS, then the time and peak RSS until the SHAP explainer
+the app uses is ready as well. Run from the repository root:
+
+    python -m benchmarks.bench_artifacts
+"""
+import json
+import statistics
+import subprocess
+import sys
+
+
+REPEATS = 5
+
+SOURCES = {
+    "caa_model": {"pickle": "models/caa_model.pkl", "packaged": "models/caa_model"},
+    "ivig_model": {"pickle": "models/ivig_model.pkl", "packaged": "models/ivig_forest"},
+}
+
+CHILD = """
+import json, resource, sys, time, warnings
+import numpy, pandas  # 두 형식 모두 필요하므로 측정에서 제외
+from utils.model_registry import current_rss_bytes
+warnings.simplefilter("ignore")
+fmt, path = sys.argv[1], sys.argv[2]
+rss_before = current_rss_bytes()
+start = time.perf_counter()
+if fmt == "pickle":
+    import pickle
+    with open(path, "rb") as f:
+        model = pickle.load(f)
+else:
+    from utils.artifacts import load_artifact
+    model = load_artifact(path)
+load_ms = (time.perf_counter() - start) * 1000
+rss_mb = (current_rss_bytes() - rss_before) / 2**20
+peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+# 앱에서 쓰는 explainer: CatBoost 는 lookup table (아티팩트에 저장된 것 또는 새로 계산), forest 는 TreeSHAP
+if hasattr(model, "get_cat_feature_indices"):
+    from utils.explain import catboost_explainer as make_explainer
+elif fmt == "pickle":
+    from shap import TreeExplainer as make_explainer
+else:
+    from utils.artifacts import forest_explainer as make_explainer
+make_explainer(model)
+print(json.dumps({
+    "load_ms": load_ms,
+    "rss_mb": rss_mb,
+    "peak_rss_mb": peak_rss_mb,
+    "ready_ms": (time.perf_counter() - start) * 1000,
+    "ready_peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def measure(fmt, path):
+    runs = []
+    for _ in range(REPEATS):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD, fmt, path], capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+def main():
+    print(
+        f"{'model':<12}{'format':<10}{'load (ms)':>12}{'RSS (MB)':>10}{'peak RSS (MB)':>15}"
+        f"{'+ explainer (ms)':>18}{'peak RSS (MB)':>15}"
+    )
+    for name, paths in SOURCES.items():
+        for fmt, path in paths.items():
+            result = measure(fmt, path)
+            print(
+                f"{name:<12}{fmt:<10}{result['load_ms']:>12.1f}{result['rss_mb']:>10.1f}{result['peak_rss_mb']:>15.1f}"
+                f"{result['ready_ms']:>18.1f}{result['ready_peak_rss_mb']:>15.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
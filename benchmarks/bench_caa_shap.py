@@ -0,0 +1,74 @@
+"""Per-patient CAA explanation latency: generic shap explainer vs the native fast paths.
+
+The fast paths run on the packaged model as the app loads it
+(``utils.artifacts.load_artifact``); the lookup explainer uses the tables
+stored in the artifact. Run from the repository root:
+
+    python -m benchmarks.bench_caa_shap
+"""
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+import shap
+
+from utils.artifacts import load_artifact
+from utils.explain import CatBoostShapExplainer, ObliviousTreeShapExplainer, catboost_explainer
+from utils.features import CAA_FEATURE_ORDER
+
+
+ARTIFACT = "models/caa_model"
+
+
+def synthetic_patients(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.uniform(0, 10, (n, len(CAA_FEATURE_ORDER))), columns=CAA_FEATURE_ORDER)
+    X["Sex"] = rng.integers(0, 2, n)
+    return X
+
+
+def per_call_ms(fn, rows, repeat):
+    fn(rows[0])  # warm-up
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(rows[i % len(rows)])
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(repeat=200):
+    with open("models/caa_model.pkl", "rb") as f:
+        model = pickle.load(f)
+    X = synthetic_patients(repeat)
+    rows = [X.iloc[[i]] for i in range(len(X))]
+
+    # Before: generic shap explainer pickled next to the model
+    start = time.perf_counter()
+    blob = pickle.dumps(shap.TreeExplainer(model))
+    generic = pickle.loads(blob)
+    generic_load_ms = (time.perf_counter() - start) * 1000
+
+    # After: explainers on the packaged model, as in the app
+    start = time.perf_counter()
+    packaged = load_artifact(ARTIFACT)
+    print(f"Artifact load: {(time.perf_counter() - start) * 1000:.1f} ms")
+    if packaged.shap_tables is None:
+        raise SystemExit(f"{ARTIFACT} has no stored SHAP tables; re-export it with python -m utils.artifacts")
+
+    results = [("shap.TreeExplainer (pickle)", generic_load_ms, generic)]
+    for label, factory in [("CatBoost ShapValues", CatBoostShapExplainer), ("Oblivious-tree lookup", catboost_explainer)]:
+        start = time.perf_counter()
+        explainer = factory(packaged)
+        results.append((label, (time.perf_counter() - start) * 1000, explainer))
+    if not isinstance(explainer, ObliviousTreeShapExplainer):
+        raise SystemExit(f"catboost_explainer fell back to {type(explainer).__name__}")
+
+    reference = generic(X).values
+    print(f"{'explainer':<28}{'setup (ms)':>12}{'per patient (ms)':>18}{'max |diff|':>12}")
+    for label, setup_ms, explainer in results:
+        max_diff = float(np.abs(explainer(X).values - reference).max())
+        print(f"{label:<28}{setup_ms:>12.1f}{per_call_ms(explainer, rows, repeat):>18.2f}{max_diff:>12.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""IVIG RandomForest: sklearn pickle vs memory-mapped compiled forest.
+
+Checks bit-identical predict_proba, then reports load time, resident memory
+and rows/sec per batch size. Run from the repository root:
+
+    python -m benchmarks.bench_ivig_forest
+"""
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.compiled_forest import CompiledForest, check_parity
+from utils.features import IVIG_FEATURE_ORDER
+from utils.model_registry import current_rss_bytes
+
+
+BATCH_SIZES = (1, 64, 1000, 10000)
+
+
+def synthetic_patients(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.uniform(0, 100, (n, len(IVIG_FEATURE_ORDER))), columns=IVIG_FEATURE_ORDER)
+
+
+def timed_load(load):
+    rss_before = current_rss_bytes()
+    start = time.perf_counter()
+    obj = load()
+    return obj, (time.perf_counter() - start) * 1000, (current_rss_bytes() - rss_before) / 2**20
+
+
+def rows_per_sec(predict_proba, X, min_seconds=0.5):
+    predict_proba(X)  # warm-up
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_seconds:
+        predict_proba(X)
+        calls += 1
+    return calls * len(X) / (time.perf_counter() - start)
+
+
+def main():
+    import sklearn.ensemble  # noqa: F401  (라이브러리 import 시간은 로드 시간에서 제외)
+
+    def load_pickle():
+        with open("models/ivig_model.pkl", "rb") as f:
+            return pickle.load(f)
+
+    model, pickle_ms, pickle_mb = timed_load(load_pickle)
+    forest, forest_ms, forest_mb = timed_load(lambda: CompiledForest.load("models/ivig_forest"))
+    model.n_jobs = 1
+
+    X = synthetic_patients(max(BATCH_SIZES))
+    assert check_parity(model, forest, X), "compiled forest predict_proba differs from sklearn"
+    print(f"parity: bit-identical on {len(X):,} rows")
+
+    print(f"{'':<18}{'load (ms)':>10}{'RSS (MB)':>10}" + "".join(f"{'rows/s @' + str(b):>16}" for b in BATCH_SIZES))
+    for label, obj, load_ms, rss_mb in [
+        ("sklearn pickle", model, pickle_ms, pickle_mb),
+        ("compiled (mmap)", forest, forest_ms, forest_mb),
+    ]:
+        rates = [rows_per_sec(obj.predict_proba, X.iloc[:b]) for b in BATCH_SIZES]
+        print(f"{label:<18}{load_ms:>10.1f}{rss_mb:>10.1f}" + "".join(f"{r:>16,.0f}" for r in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Streamlit startup: time to first render of every page.
+
+Each page is rendered in a fresh Python process (AppTest, no browser), so
+module imports and model loading are paid exactly as on a cold container.
+"cold" is the first render with background warm-up disabled; "warm" is
+the first render after ``warmup.warm`` has run in that process, i.e. a
+user arriving once the server finished warming. Only public APIs are
+used (``import app`` and ``AppTest.from_file("app.py").run()``), so the
+render times include AppTest's own per-run overhead (component discovery
+and the like) that ``streamlit run`` pays once at server start. Compare
+pages and cold/warm with each other rather than reading the numbers as
+absolute browser latency. Run from the repository root:
+
+    python -m benchmarks.bench_startup
+"""
+import json
+import os
+import subprocess
+import sys
+
+from app import PAGE_MODULES
+
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import app  # Streamlit 과 페이지 목록 등 app.py 가 시작 시 import 하는 모듈
+import_ms = (time.perf_counter() - start) * 1000
+from streamlit.testing.v1 import AppTest
+if sys.argv[2] == "warm":
+    import warmup
+    from utils.model_loader import get_registry
+    warmup.warm(get_registry())
+at = AppTest.from_file("app.py", default_timeout=300)
+at.session_state.page = sys.argv[1]
+start = time.perf_counter()
+at.run()
+render_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({"app_import_ms": import_ms, "render_ms": render_ms, "errors": len(at.exception)}))
+"""
+
+
+def first_render(page, mode):
+    env = dict(os.environ, KD_WARMUP="0")
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, page, mode], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    print(f"{'page':<10}{'cold (ms)':>12}{'warm (ms)':>12}")
+    for page in PAGE_MODULES:
+        cold = first_render(page, "cold")
+        warm = first_render(page, "warm")
+        flag = "  (page raised)" if cold["errors"] or warm["errors"] else ""
+        print(f"{page:<10}{cold['render_ms']:>12.0f}{warm['render_ms']:>12.0f}{flag}")
+    print(f"import app (not included above): {cold['app_import_ms']:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Reproducible benchmark suite: loading, inference, explanation and chart rendering.
+
+Uses the model artifacts the app serves (``utils.model_registry``) and
+synthetic patients drawn uniformly from the allowed range of every
+variable in ``utils/features.py`` (the ranges documented in
+``docs/API.md``), with a fixed seed. Stages:
+
+* ``load.<artifact>``: load in a fresh process, including library imports, plus peak RSS
+* ``predict_proba.<model>.<batch>``: batch sizes 1 to 10,000
+* ``explain.<model>.<batch>``: SHAP values for 1 and 100 patients (``ivig_fast``: approximate path attribution)
+* ``render.<kind>.<backend>``: waterfall and bar chart, Vega-Lite spec (JSON) and matplotlib PNG
+
+Each stage reports the median, p95 and minimum time per call. Write the
+results to JSON and compare a later run against them; with a baseline the
+exit status is 1 when any stage's median (or ``--metric min_ms``, steadier
+on shared machines) slowed down by more than ``--threshold`` percent.
+Run from the repository root:
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --baseline bench.json --threshold 15
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+from importlib import metadata
+
+import numpy as np
+
+
+BATCH_SIZES = (1, 10, 100, 1000, 10000)
+EXPLAIN_BATCH_SIZES = (1, 100)
+# 측정 이름 -> (모델, explainer 아티팩트); ivig_fast 는 근사 설명 (path attribution)
+EXPLAINERS = {
+    "caa": ("caa", "caa_explainer"),
+    "ivig": ("ivig", "ivig_explainer"),
+    "ivig_fast": ("ivig", "ivig_fast_explainer"),
+}
+LOAD_ARTIFACTS = ("caa_model", "caa_explainer", "ivig_model", "ivig_explainer")
+GROUPS = ("load", "predict_proba", "explain", "render")
+SEED = 0
+
+# 차이가 이보다 작으면 측정 잡음으로 보고 회귀로 판정하지 않음
+MIN_DELTA_MS = 0.05
+
+LOAD_CHILD = """
+import json, resource, sys, time, warnings
+warnings.simplefilter("ignore")
+start = time.perf_counter()
+from utils.model_registry import ModelRegistry
+ModelRegistry().get(sys.argv[1])
+print(json.dumps({
+    "ms": (time.perf_counter() - start) * 1000,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def synthetic_patients(model_name, n, seed=SEED):
+    """``n`` patients with every variable uniform over its allowed range"""
+    from utils.features import FEATURES, FEATURE_ORDERS, cast_categoricals, to_model_frame
+
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name in FEATURE_ORDERS[model_name]:
+        spec = FEATURES[name]
+        if spec.choices:
+            columns[name] = rng.choice(sorted(spec.choices), n)
+        else:
+            columns[name] = rng.uniform(spec.low, spec.high, n)
+    return cast_categoricals(to_model_frame(columns, FEATURE_ORDERS[model_name]))
+
+
+def time_calls(fn, min_seconds, min_calls=5, max_calls=1000):
+    """Per-call timings in ms after one warm-up call"""
+    fn()
+    timings = []
+    deadline = time.perf_counter() + min_seconds
+    while len(timings) < min_calls or (time.perf_counter() < deadline and len(timings) < max_calls):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings, **extra):
+    return {
+        "median_ms": statistics.median(timings),
+        "p95_ms": float(np.percentile(timings, 95)),
+        "min_ms": min(timings),
+        "calls": len(timings),
+        **extra,
+    }
+
+
+def bench_load(repeats):
+    results = {}
+    for name in LOAD_ARTIFACTS:
+        runs = []
+        for _ in range(repeats):
+            out = subprocess.run(
+                [sys.executable, "-c", LOAD_CHILD, name], capture_output=True, text=True, check=True
+            ).stdout
+            runs.append(json.loads(out.strip().splitlines()[-1]))
+        timings = [run["ms"] for run in runs]
+        results[f"load.{name}"] = summarize(timings, peak_rss_mb=max(run["peak_rss_mb"] for run in runs))
+    return results
+
+
+def bench_predict(registry, min_seconds):
+    results = {}
+    for model_name in ("caa", "ivig"):
+        model = registry.get(f"{model_name}_model")
+        X = synthetic_patients(model_name, max(BATCH_SIZES))
+        for size in BATCH_SIZES:
+            batch = X.iloc[:size]
+            timings = time_calls(lambda: model.predict_proba(batch), min_seconds)
+            rows_per_sec = size / (statistics.median(timings) / 1000)
+            results[f"predict_proba.{model_name}.{size}"] = summarize(timings, rows_per_sec=rows_per_sec)
+    return results
+
+
+def bench_explain(registry, min_seconds):
+    results = {}
+    for label, (model_name, artifact) in EXPLAINERS.items():
+        explainer = registry.get(artifact)
+        X = synthetic_patients(model_name, max(EXPLAIN_BATCH_SIZES))
+        for size in EXPLAIN_BATCH_SIZES:
+            batch = X.iloc[:size]
+            results[f"explain.{label}.{size}"] = summarize(time_calls(lambda: explainer(batch), min_seconds))
+    return results
+
+
+def bench_render(registry, min_seconds):
+    from utils.features import display_names
+    from utils.plots import bar_spec, matplotlib_png, waterfall_spec
+    from utils.result_cache import ResultCache, cached_explanation
+
+    # 앱과 같은 단일 환자 양성 클래스 설명으로 렌더링 (CAA, 15개 변수 표시)
+    X = synthetic_patients("caa", 1)
+    explanation = cached_explanation(ResultCache(), "caa_explainer", None, X, registry.get("caa_explainer"))
+    explanation.feature_names = display_names(explanation.feature_names)
+
+    results = {}
+    for kind, build in (("waterfall", waterfall_spec), ("bar", bar_spec)):
+        results[f"render.{kind}.vega"] = summarize(
+            time_calls(lambda: json.dumps(build(explanation, 15)), min_seconds)
+        )
+        results[f"render.{kind}.matplotlib"] = summarize(
+            time_calls(lambda: matplotlib_png(explanation, kind, 15), min_seconds, min_calls=3)
+        )
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    libraries = {}
+    for package in ("numpy", "pandas", "shap", "catboost", "matplotlib"):
+        try:
+            libraries[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            libraries[package] = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "libraries": libraries,
+        "seed": SEED,
+    }
+
+
+def run(groups=GROUPS, min_seconds=1.0, load_repeats=3):
+    from utils.model_registry import ModelRegistry
+
+    registry = ModelRegistry()
+    stages = {}
+    if "load" in groups:
+        stages.update(bench_load(load_repeats))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        if "predict_proba" in groups:
+            stages.update(bench_predict(registry, min_seconds))
+        if "explain" in groups:
+            stages.update(bench_explain(registry, min_seconds))
+        if "render" in groups:
+            stages.update(bench_render(registry, min_seconds))
+
+    meta = environment()
+    meta["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"meta": meta, "stages": stages}
+
+
+def compare(results, baseline, threshold, metric="median_ms"):
+    """Rows of (stage, baseline ms, current ms, change %, regressed) for stages present in both"""
+    rows = []
+    for stage, current in results["stages"].items():
+        previous = baseline["stages"].get(stage)
+        if previous is None:
+            continue
+        before, after = previous[metric], current[metric]
+        change = (after - before) / before * 100 if before else 0.0
+        regressed = change > threshold and after - before > MIN_DELTA_MS
+        rows.append((stage, before, after, change, regressed))
+    return rows
+
+
+def print_results(results):
+    print(f"{'stage':<32}{'median (ms)':>13}{'p95 (ms)':>11}{'calls':>7}  extra")
+    for stage, r in results["stages"].items():
+        extra = ""
+        if "rows_per_sec" in r:
+            extra = f"{r['rows_per_sec']:,.0f} rows/s"
+        elif "peak_rss_mb" in r:
+            extra = f"peak RSS {r['peak_rss_mb']:.0f} MB"
+        print(f"{stage:<32}{r['median_ms']:>13.3f}{r['p95_ms']:>11.3f}{r['calls']:>7}  {extra}")
+    print(f"suite peak RSS: {results['meta']['peak_rss_mb']:.0f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="fail when a stage's median is more than this many percent slower (default 10)")
+    parser.add_argument("--metric", choices=("median_ms", "min_ms"), default="median_ms",
+                        help="statistic compared against the baseline (default median_ms)")
+    parser.add_argument("--only", default=",".join(GROUPS), help=f"comma-separated stage groups ({', '.join(GROUPS)})")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="minimum timing time per stage")
+    parser.add_argument("--load-repeats", type=int, default=3, help="fresh processes per load stage")
+    args = parser.parse_args(argv)
+
+    groups = [g.strip() for g in args.only.split(",") if g.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown stage groups: {', '.join(sorted(unknown))}")
+
+    results = run(groups, args.min_seconds, args.load_repeats)
+    print_results(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold, args.metric)
+        print(f"\ncompared with {baseline['meta'].get('commit')} ({args.metric}, threshold {args.threshold:g}%)")
+        print(f"{'stage':<32}{'baseline':>11}{'current':>11}{'change':>9}")
+        for stage, before, after, change, regressed in rows:
+            flag = "  ❌ regression" if regressed else ""
+            print(f"{stage:<32}{before:>11.3f}{after:>11.3f}{change:>8.1f}%{flag}")
+        regressions = [row for row in rows if row[4]]
+        if regressions:
+            print(f"❌ {len(regressions)} stage(s) slower than the baseline by more than {args.threshold:g}%")
+            return 1
+        print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
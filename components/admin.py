@@ -0,0 +1,77 @@
+import pandas as pd
+import streamlit as st
+
+from utils.metrics import metrics
+from utils.model_loader import get_batchers, get_job_queue, get_registry, get_result_cache
+from utils.plots import plot_cache
+
+
+def show():
+    """Display the admin page: model registry, caches, micro-batching, jobs and stage metrics"""
+    st.title("Admin")
+    st.write("*Runtime status shared by all sessions of this server process*")
+
+    st.subheader("Model Registry")
+    rows = get_registry().stats()
+    for row in rows:
+        if row["loaded_at"] is not None:
+            row["loaded_at"] = pd.Timestamp(row["loaded_at"], unit="s").strftime("%Y-%m-%d %H:%M:%S")
+    st.dataframe(pd.DataFrame(rows), hide_index=True)
+
+    st.subheader("Result Cache")
+    stats = get_result_cache().stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Hits", f"{stats['hits']:,}")
+    col2.metric("Disk hits", f"{stats['disk_hits']:,}")
+    col3.metric("Misses", f"{stats['misses']:,}")
+    col4.metric("Hit rate", f"{stats['hit_rate']:.1%}")
+    disk = "disabled" if stats["disk_entries"] is None else f"{stats['disk_entries']:,} entries"
+    st.write(f"Memory: {stats['entries']:,} entries · Disk (SQLite): {disk}")
+
+    st.subheader("Chart Cache")
+    col1, col2 = st.columns(2)
+    col1.metric("Hits", f"{plot_cache.hits:,}")
+    col2.metric("Misses", f"{plot_cache.misses:,}")
+
+    st.subheader("Micro-batching")
+    for model_name in ("caa", "ivig"):
+        for name, batcher in get_batchers(model_name).items():
+            stats = batcher.stats()
+            st.write(
+                f"**{name}**: queue {stats['queue_depth']}, {stats['batches']:,} batches, "
+                f"{stats['requests']:,} requests, mean size {stats['mean_batch_size']:.1f}, "
+                f"errors {stats['errors']}"
+            )
+            if stats["batches"]:
+                st.bar_chart(pd.Series(stats["batch_size_histogram"], name="batches"))
+
+    st.subheader("Job Queue")
+    stats = get_job_queue().stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Workers", stats["workers"] or "inline")
+    col2.metric("Chunks running", stats["in_flight"])
+    col3.metric("Chunks queued", f"{stats['queued_chunks']:,}")
+    col4.metric("Active jobs", stats["active_jobs"])
+    if stats["jobs"]:
+        st.dataframe(pd.DataFrame(stats["jobs"]).head(50), hide_index=True)
+
+    st.subheader("Stage Metrics")
+    rows = metrics.stats()
+    if rows:
+        st.dataframe(pd.DataFrame(rows), hide_index=True)
+    else:
+        st.write("No requests recorded yet.")
+    st.download_button(
+        "Download Prometheus metrics", metrics.render_prometheus(), file_name="metrics.txt", mime="text/plain"
+    )
+
+    st.subheader("Profiling")
+    col1, col2 = st.columns(2)
+    n = col1.number_input("Requests to profile", min_value=1, max_value=100, value=5, step=1)
+    if col2.button("Profile next requests"):
+        metrics.profile_next(int(n))
+    st.write(f"Pending profiled requests: {metrics.profile_remaining}")
+    for profile in reversed(metrics.profiles):
+        started = pd.Timestamp(profile["started_at"], unit="s").strftime("%Y-%m-%d %H:%M:%S")
+        with st.expander(f"{profile['name']} · {started} · {profile['seconds'] * 1000:.0f} ms"):
+            st.code(profile["stats"], language=None)
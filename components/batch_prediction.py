@@ -0,0 +1,114 @@
+import numpy as np
+import streamlit as st
+
+from components.job_status import finished, submit
+from utils.batch import assemble_scored, prepare_features, read_table
+from utils.features import FEATURE_ORDERS, FEATURES, cast_categoricals
+from utils.jobs import score_task
+from utils.model_loader import get_shap_store, load_models
+
+
+# 작업 큐 청크 크기: 청크 하나가 1초 이내에 끝나도록 (다른 세션의 요청이 그 사이에 실행됨)
+SCORE_CHUNK_ROWS = 10_000
+EXPLAIN_CHUNK_ROWS = 200
+
+MODEL_OPTIONS = {
+    "caa": "Coronary Aneurysm (CatBoost)",
+    "ivig": "IVIG Resistance (RandomForest)",
+}
+
+
+def show():
+    """Display the batch/cohort scoring page"""
+    st.title("Batch Cohort Scoring")
+    st.write("*Score a whole cohort from a CSV or XLSX file in background worker processes*")
+
+    model_name = st.radio(
+        "Model", list(MODEL_OPTIONS), format_func=MODEL_OPTIONS.get, horizontal=True
+    )
+
+    with st.expander("Required columns"):
+        st.dataframe(
+            [
+                {"column": name, "description": FEATURES[name].display_name, "accepted": FEATURES[name].range_text}
+                for name in FEATURE_ORDERS[model_name]
+            ],
+            hide_index=True,
+        )
+        st.write("Extra columns (e.g. patient IDs) are kept in the output. Rows with missing or out-of-range values are reported, not scored.")
+
+    uploaded = st.file_uploader("Patient file", type=["csv", "xlsx"])
+    record_shap = st.checkbox(
+        "Add SHAP explanations to the SHAP Summary",
+        help="Explains every valid row, which is much slower than scoring alone",
+    )
+
+    if uploaded is not None and st.button("Score Cohort", type="primary"):
+        try:
+            df = read_table(uploaded, uploaded.name)
+        except Exception as e:
+            st.error(f"⚠️ Could not read file: {str(e)}")
+            st.stop()
+
+        if load_models([f"{model_name}_model"]) is None:
+            st.stop()
+
+        try:
+            X, errors = prepare_features(df, FEATURE_ORDERS[model_name])
+        except ValueError as e:
+            st.error(f"⚠️ {str(e)}")
+            st.stop()
+
+        # 유효한 행만 청크로 나누어 작업 큐에 제출
+        valid = (errors == "").to_numpy()
+        X_valid = cast_categoricals(X[valid])
+        chunk_rows = EXPLAIN_CHUNK_ROWS if record_shap else SCORE_CHUNK_ROWS
+        chunks = [
+            (model_name, X_valid.iloc[start:start + chunk_rows], record_shap)
+            for start in range(0, len(X_valid), chunk_rows)
+        ]
+        job = submit("batch", score_task, chunks, f"Scoring {len(df):,} rows")
+        if job is None:
+            st.stop()
+        st.session_state.batch_request = {
+            "job": job.id, "model": model_name, "df": df, "errors": errors,
+            "X": X_valid, "record_shap": record_shap, "recorded": False,
+        }
+
+    request = st.session_state.get("batch_request")
+    if request is None:
+        return
+    job = finished(request["job"])
+    if job is None:
+        return
+
+    df, errors = request["df"], request["errors"]
+    probs = np.full(len(df), np.nan)
+    if job.results:
+        probs[(errors == "").to_numpy()] = np.concatenate([r["probability"] for r in job.results])
+    scored, summary = assemble_scored(df, request["model"], errors, probs, job.run_seconds)
+
+    if request["record_shap"]:
+        if job.results and not request["recorded"]:
+            shap_values = np.concatenate([r["shap_values"] for r in job.results])
+            get_shap_store(request["model"]).append(shap_values, request["X"].to_numpy(dtype=float))
+            request["recorded"] = True
+        st.success(f"Added {summary['scored']:,} explanations to the SHAP Summary.")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Rows scored", f"{summary['scored']:,} / {summary['rows']:,}")
+    col2.metric("Rows with errors", f"{summary['errors']:,}")
+    col3.metric("Throughput", f"{summary['rows_per_sec']:,.0f} rows/sec")
+    st.caption(f"Waited {job.wait_seconds:.1f}s for a worker, ran {job.run_seconds:.1f}s ({job.total} chunks)")
+
+    if summary["errors"]:
+        st.warning("Some rows could not be scored. They are kept in the output with an error message.")
+        st.dataframe(scored.loc[scored["error"] != "", ["error"]].head(100))
+
+    st.dataframe(scored.head(100))
+    st.download_button(
+        "Download scored file (CSV)",
+        data=scored.to_csv(index=False).encode("utf-8"),
+        file_name=f"{request['model']}_scored.csv",
+        mime="text/csv",
+    )
@@ -1,7 +1,12 @@
 import streamlit as st
-import pandas as pd
-import shap
-import matplotlib.pyplot as plt
+
+from components import risk_message, sensitivity, shap_charts
+from components.feature_form import feature_inputs, validated_frame
+from components.job_status import prediction_ready, start_prediction
+from utils.features import CAA_FEATURE_ORDER, FEATURES, FORM_LAYOUTS, display_names
+from utils.metrics import metrics
+from utils.model_loader import get_registry, get_result_cache, get_shap_store
+from utils.result_cache import cached_explanation, cached_probability, canonicalize
 
 
 def show(model, explainer):
@@ -13,6 +18,7 @@ def show(model, explainer):
     
     col1, col2, col3 = st.columns(3)
     
+    layout = FORM_LAYOUTS["caa"]
     user_input = {}
     
     with col1:
@@ -22,16 +28,7 @@ def show(model, explainer):
         Results within 3 days prior to the 1st IVIG administration
         </div>
         """, unsafe_allow_html=True)
-        user_input["CRP_before"] = st.number_input("C-Reactive Protein (mg/dL)", value=None, placeholder="0.00", format="%.2f")
-        user_input["ESR_before"] = st.number_input("ESR (mm/hr)", value=None, placeholder="0.00", format="%.2f")
-        user_input["P_before"] = st.number_input("Phosphorus (mg/dL)", value=None, placeholder="0.00", format="%.2f")
-        user_input["TB_before"] = st.number_input("Total Bilirubin (mg/dL)", value=None, placeholder="0.00", format="%.2f")
-        user_input["ALT_before"] = st.number_input("Alanine Aminotransferase (IU/L)", value=None, placeholder="0.00", format="%.2f")
-        user_input["AST_before"] = st.number_input("Aspartate Aminotransferase (IU/L)", value=None, placeholder="0.00", format="%.2f")
-        user_input["HCT_before"] = st.number_input("Hematocrit (%)", value=None, placeholder="0.00", format="%.2f")
-        user_input["Hb_before"] = st.number_input("Hemoglobin (g/dL)", value=None, placeholder="0.00", format="%.2f")
-        user_input["Alb_before"] = st.number_input("Albumin (g/dL)", value=None, placeholder="0.00", format="%.2f")
-        user_input["Protein_before"] = st.number_input("Protein (g/dL)", value=None, placeholder="0.00", format="%.2f")
+        user_input.update(feature_inputs(layout["lab"]))
     
     with col2:
         st.markdown("**Echocardiographic Parameters**")
@@ -40,62 +37,39 @@ def show(model, explainer):
         Initial echocardiography Z-scores calculated using Dallaire and Dahdah nomograms
         </div>
         """, unsafe_allow_html=True)
-        user_input["initial_echo_RCA_Z"] = st.number_input("Right Coronary Artery Z-score", value=None, placeholder="0.00", format="%.2f")
-        user_input["initial_echo_LMCA_Z"] = st.number_input("Left Main Coronary Artery Z-score", value=None, placeholder="0.00", format="%.2f")
-        user_input["initial_echo_LAD_Z"] = st.number_input("Left Anterior Descending Z-score", value=None, placeholder="0.00", format="%.2f")
-        user_input["initial_echo_LCx_Z"] = st.number_input("Left Circumflex Z-score", value=None, placeholder="0.00", format="%.2f")
+        user_input.update(feature_inputs(layout["echo"]))
     
     with col3:
         st.markdown("**Clinical Parameters**")
-        user_input["fever_duration"] = st.number_input("Fever Duration (days)", value=None, placeholder="0.0", format="%.1f")
-        user_input["Sex"] = st.selectbox(
-            "Sex", [None, 0, 1], 
-            format_func=lambda x: "--- Select ---" if x is None else ("Male" if x == 1 else "Female")
-        )
-    
-    feature_order = [
-        "initial_echo_LAD_Z", "initial_echo_LMCA_Z", "initial_echo_RCA_Z", "initial_echo_LCx_Z",
-        "fever_duration", "Sex", "AST_before", "ALT_before", "CRP_before", "ESR_before", "HCT_before", "Hb_before",
-        "P_before", "TB_before", "Alb_before", "Protein_before"
-    ]
-    
-    # Feature names mapping for SHAP display
-    feature_names_map = {
-        "initial_echo_LAD_Z": "Left Anterior Descending Z-score",
-        "initial_echo_LMCA_Z": "Left Main Coronary Artery Z-score",
-        "initial_echo_RCA_Z": "Right Coronary Artery Z-score",
-        "initial_echo_LCx_Z": "Left Circumflex Z-score",
-        "fever_duration": "Fever Duration (days)",
-        "Sex": "Sex",
-        "ALT_before": "Alanine Aminotransferase (IU/L)",
-        "AST_before": "Aspartate Aminotransferase (IU/L)",
-        "Hb_before" : "Hemoglobin (g/dL)",
-        "HCT_before": "Hematocrit (%)",
-        "P_before": "Phosphorus (mg/dL)",
-        "CRP_before": "C-Reactive Protein (mg/dL)",
-        "ESR_before": "ESR (mm/hr)",
-        "TB_before": "Total Bilirubin (mg/dL)",
-        "Alb_before" : "Albumin (g/dL)",
-        "Protein_before" : "Protein (g/dL)", 
-    }
+        user_input.update(feature_inputs(layout["clinical"]))
     
+    # 입력값이 바뀌면 이전 예측 결과는 표시하지 않음
+    request = st.session_state.get("caa_request")
+    if request is not None and request["inputs"] != user_input:
+        request = st.session_state["caa_request"] = None
+
     if st.button("Predict Coronary Aneurysm Risk", type="primary"):
-        # Validate all fields are filled
-        missing_fields = []
-        for field, value in user_input.items():
-            if value is None:
-                missing_fields.append(field)
-        
-        if missing_fields:
-            st.error(f"⚠️ Please fill in all required fields. {len(missing_fields)} field(s) are missing.")
-            st.warning("All laboratory parameters, echocardiographic measurements, fever duration, and sex must be provided.")
+        # 결측값과 허용 범위를 벗어난 값을 한 번에 검사
+        with metrics.stage("caa.validate"):
+            X_input = validated_frame(user_input, CAA_FEATURE_ORDER, "All laboratory parameters, echocardiographic measurements, fever duration, and sex must be provided.")
+        if X_input is None:
             st.stop()
+        if model is None:
+            st.error("Model not loaded properly.")
+            st.stop()
+
+        # 예측과 SHAP 계산은 작업 큐의 워커 프로세스에서 실행하고 결과는 캐시에 저장
+        request = st.session_state["caa_request"] = start_prediction("caa", canonicalize(X_input), user_input)
+
+    if request is not None and prediction_ready(request):
+        X_input = request["X"]
+        with metrics.request("caa"):
+            cache = get_result_cache()
+            registry = get_registry()
+            with metrics.stage("caa.result_lookup"):
+                pred_prob = cached_probability(cache, "caa_model", registry.fingerprint("caa_model"), X_input, model)
+            model_id = ("caa", registry.fingerprint("caa_model"))
         
-        if model is not None:
-            X_input = pd.DataFrame([user_input])
-            X_input = X_input[feature_order]
-            pred_prob = model.predict_proba(X_input)[0, 1]
-            
             col1, col2 = st.columns([1, 1])
             with col1:
                 st.metric(
@@ -103,60 +77,40 @@ def show(model, explainer):
                     value=f"{pred_prob:.1%}",
                     delta=f"{'High Risk' if pred_prob > 0.5 else 'Low Risk'}"
                 )
-            
+        
             with col2:
-                if pred_prob > 0.7:
-                    st.error("High risk: Enhanced monitoring recommended")
-                elif pred_prob > 0.3:
-                    st.warning("Moderate risk: Careful surveillance required")
-                else:
-                    st.success("Low risk: Standard monitoring")
-            
+                risk_message.show("caa", pred_prob)
+        
             if explainer is not None:
                 try:
                     # Create a copy for SHAP display with readable Sex values
                     X_display = X_input.copy()
                     if 'Sex' in X_display.columns:
-                        X_display['Sex'] = X_display['Sex'].map({0: 'Female', 1: 'Male'})
-                    
-                    shap_values = explainer(X_input)
-                    
+                        X_display['Sex'] = X_display['Sex'].map(FEATURES['Sex'].choices)
+                
+                    with metrics.stage("caa.explain_lookup"):
+                        shap_values = cached_explanation(
+                            cache, "caa_explainer", registry.fingerprint("caa_explainer"), X_input, explainer
+                        )
+                    # 모집단 SHAP 요약에 기록
+                    if not request["recorded"]:
+                        with metrics.stage("caa.shap_store"):
+                            get_shap_store("caa").append(shap_values.values, X_input.to_numpy(dtype=float))
+                        request["recorded"] = True
+                
                     # Update feature names for better display
-                    if hasattr(shap_values, 'feature_names') and shap_values.feature_names is not None:
-                        enhanced_names = []
-                        for i, name in enumerate(shap_values.feature_names):
-                            readable_name = feature_names_map.get(name, name)
-                            enhanced_names.append(readable_name)
-                        shap_values.feature_names = enhanced_names
-                    
+                    shap_values.feature_names = display_names(shap_values.feature_names)
+                
                     # Update data values for display (Sex variable handling)
                     if hasattr(shap_values, 'data'):
-                        shap_values.data = X_display.values
-                    
+                        shap_values.data = X_display.values[0]
+                
                     st.write("---")
                     st.subheader("Feature Importance Analysis")
+                
+                    shap_charts.show(shap_values, model_id, X_input, max_display=15)
                     
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write("**Waterfall Plot**")
-                        fig1, ax1 = plt.subplots(figsize=(12, 8))
-                        plt.rcParams.update({'font.size': 10})
-                        shap.plots.waterfall(shap_values[0], max_display=15, show=False)
-                        plt.tight_layout()
-                        st.pyplot(fig1)
-                        plt.close(fig1)
-                    
-                    with col2:
-                        st.write("**Feature Importance (Bar Chart)**")
-                        fig3, ax3 = plt.subplots(figsize=(12, 8))
-                        plt.rcParams.update({'font.size': 10})
-                        shap.plots.bar(shap_values[0], max_display=15, show=False)
-                        plt.tight_layout()
-                        st.pyplot(fig3)
-                        plt.close(fig3)
-                        
                 except Exception as e:
                     st.error(f"SHAP analysis error: {str(e)}")
-        else:
-            st.error("Model not loaded properly.") 
+
+            sensitivity.show("caa", model, model_id, X_input, pred_prob)
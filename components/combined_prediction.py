@@ -0,0 +1,119 @@
+import streamlit as st
+
+from components import risk_message, shap_charts
+from components.feature_form import feature_inputs, validated_frame
+from components.job_status import prediction_ready, start_assessment
+from utils.combined import MODELS, project
+from utils.features import COMBINED_FEATURE_ORDER, FEATURES, FORM_LAYOUTS, SHARED_FEATURES, display_names
+from utils.metrics import metrics
+from utils.model_loader import get_registry, get_result_cache, get_shap_store
+from utils.result_cache import cached_explanation, cached_probability, canonicalize
+
+
+TITLES = {"caa": "Coronary Aneurysm", "ivig": "IVIG Resistance"}
+# 확률 0.5 기준 표시 (모델별 단일 페이지와 동일)
+OUTCOMES = {"caa": ("High Risk", "Low Risk"), "ivig": ("Resistant", "Responsive")}
+
+
+def show_result(model_name, model, explainer, X_input, request):
+    """Probability, risk message and SHAP charts of one model for the combined row"""
+    cache = get_result_cache()
+    registry = get_registry()
+    X_model = project(X_input, model_name)
+    with metrics.stage(f"combined.{model_name}.result_lookup"):
+        pred_prob = cached_probability(
+            cache, f"{model_name}_model", registry.fingerprint(f"{model_name}_model"), X_model, model
+        )
+    high, low = OUTCOMES[model_name]
+    st.metric(
+        label=f"{TITLES[model_name]} Probability",
+        value=f"{pred_prob:.1%}",
+        delta=high if pred_prob > 0.5 else low,
+    )
+    risk_message.show(model_name, pred_prob)
+
+    if explainer is None:
+        return
+    try:
+        with metrics.stage(f"combined.{model_name}.explain_lookup"):
+            shap_values = cached_explanation(
+                cache, f"{model_name}_explainer", registry.fingerprint(f"{model_name}_explainer"), X_model, explainer
+            )
+        # 모집단 SHAP 요약에 기록
+        if model_name not in request["recorded"]:
+            with metrics.stage(f"combined.{model_name}.shap_store"):
+                get_shap_store(model_name).append(shap_values.values, X_model.to_numpy(dtype=float))
+            request["recorded"].add(model_name)
+
+        # 성별은 읽기 쉬운 값으로 표시
+        X_display = X_model.copy()
+        if "Sex" in X_display.columns:
+            X_display["Sex"] = X_display["Sex"].map(FEATURES["Sex"].choices)
+        shap_values.data = X_display.values[0]
+        shap_values.feature_names = display_names(shap_values.feature_names)
+
+        st.markdown("**Feature Importance Analysis**")
+        model_id = (model_name, registry.fingerprint(f"{model_name}_model"))
+        shap_charts.show(shap_values, model_id, X_model, max_display=15)
+    except Exception as e:
+        st.error(f"SHAP analysis error: {str(e)}")
+
+
+def show(models, explainers):
+    """Display the combined CAA + IVIG assessment page"""
+    st.title("Combined Assessment")
+    st.write("*Coronary aneurysm and IVIG resistance predicted together from one set of inputs*")
+    st.caption(
+        "Inputs used by both models are entered once: "
+        + ", ".join(FEATURES[name].display_name for name in SHARED_FEATURES)
+    )
+
+    col1, col2, col3 = st.columns(3)
+
+    layout = FORM_LAYOUTS["combined"]
+    user_input = {}
+
+    with col1:
+        st.markdown("**Laboratory Parameters**")
+        st.markdown("""
+        <div style='font-size: 0.8rem; color: #64748b; margin-bottom: 1rem; line-height: 1.3;'>
+        Results within 3 days prior to the 1st IVIG administration
+        </div>
+        """, unsafe_allow_html=True)
+        user_input.update(feature_inputs(layout["lab"]))
+
+    with col2:
+        st.markdown("**Echocardiographic Parameters**")
+        st.markdown("""
+        <div style='font-size: 0.8rem; color: #64748b; margin-bottom: 1rem; line-height: 1.3;'>
+        Initial echocardiography Z-scores calculated using Dallaire and Dahdah nomograms
+        </div>
+        """, unsafe_allow_html=True)
+        user_input.update(feature_inputs(layout["echo"]))
+
+    with col3:
+        st.markdown("**Clinical Parameters**")
+        user_input.update(feature_inputs(layout["clinical"]))
+
+    # 입력값이 바뀌면 이전 예측 결과는 표시하지 않음
+    request = st.session_state.get("combined_request")
+    if request is not None and request["inputs"] != user_input:
+        request = st.session_state["combined_request"] = None
+
+    if st.button("Predict Both Risks", type="primary"):
+        # 결측값과 허용 범위를 벗어난 값을 한 번에 검사
+        with metrics.stage("combined.validate"):
+            X_input = validated_frame(user_input, COMBINED_FEATURE_ORDER, "All laboratory parameters, echocardiographic measurements, fever duration, and sex must be provided.")
+        if X_input is None:
+            st.stop()
+
+        # 두 모델의 예측과 SHAP 계산을 하나의 작업으로 실행하고 결과는 모델별로 캐시에 저장
+        request = st.session_state["combined_request"] = start_assessment(canonicalize(X_input), user_input)
+
+    if request is not None and prediction_ready(request):
+        with metrics.request("combined"):
+            columns = st.columns(len(MODELS))
+            for model_name, column in zip(MODELS, columns):
+                with column:
+                    st.subheader(TITLES[model_name])
+                    show_result(model_name, models[model_name], explainers[model_name], request["X"], request)
@@ -0,0 +1,38 @@
+import streamlit as st
+
+from utils.features import FEATURES, cast_categoricals, to_model_frame, validate
+
+
+def feature_input(name):
+    """Render the input widget of one schema feature and return its value (None if empty)"""
+    spec = FEATURES[name]
+    if spec.choices:
+        return st.selectbox(
+            spec.label, [None, *spec.choices],
+            format_func=lambda x: "--- Select ---" if x is None else spec.choices[x]
+        )
+    placeholder = "0.0" if spec.fmt == "%.1f" else "0.00"
+    return st.number_input(
+        spec.display_name, value=None, placeholder=placeholder, format=spec.fmt,
+        help=f"Accepted range: {spec.range_text}"
+    )
+
+
+def feature_inputs(names):
+    return {name: feature_input(name) for name in names}
+
+
+def validated_frame(user_input, feature_order, missing_hint):
+    """Single-row model frame, or None after showing what is missing or out of range"""
+    X = to_model_frame([user_input], feature_order)
+    missing, out_of_range = validate(X, feature_order)
+    if not (missing.any() or out_of_range.any()):
+        return cast_categoricals(X)
+
+    if missing.any():
+        st.error(f"⚠️ Please fill in all required fields. {int(missing.sum())} field(s) are missing.")
+        st.warning(missing_hint)
+    if out_of_range.any():
+        fields = [FEATURES[n] for n, bad in zip(feature_order, out_of_range[0]) if bad]
+        st.error("⚠️ Out of accepted range: " + ", ".join(f"{f.display_name} ({f.range_text})" for f in fields))
+    return None
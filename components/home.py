@@ -31,7 +31,13 @@ def show():
         if st.button("Start IVIG Prediction", key="ivig_start", type="primary"):
             st.session_state.page = "ivig"
             st.rerun()
-    
+
+    st.subheader("Combined Assessment")
+    st.write("Predicts both outcomes for one patient from **24 clinical variables**; the 5 shared by both models are entered once.")
+    if st.button("Start Combined Assessment", key="combined_start"):
+        st.session_state.page = "combined"
+        st.rerun()
+
     st.write("---")
     
     with st.expander("System Information"):
@@ -1,7 +1,33 @@
+import os
+
 import streamlit as st
-import pandas as pd
-import shap
-import matplotlib.pyplot as plt
+
+from components import risk_message, sensitivity, shap_charts
+from components.feature_form import feature_inputs, validated_frame
+from components.job_status import prediction_ready, start_prediction
+from utils.features import IVIG_FEATURE_ORDER, FORM_LAYOUTS, display_names
+from utils.metrics import metrics
+from utils.model_loader import get_job_queue, get_registry, get_result_cache, get_shap_store
+from utils.result_cache import cached_explanation, cached_probability, canonicalize
+
+
+# SHAP 계산 방식: Auto 는 작업 큐가 바쁘면 빠른 근사 (path attribution), 아니면 정확한 SHAP
+EXPLAIN_MODES = ("Auto", "Exact", "Fast")
+DEFAULT_EXPLAIN_MODE = os.environ.get("KD_IVIG_EXPLAIN_MODE", "auto").capitalize()
+FAST_EXPLAINER = "ivig_fast_explainer"
+
+
+def fast_explanation_note(auto):
+    """Caption for approximate SHAP values, including their measured error against exact SHAP"""
+    note = "⚡ The server is busy, so these are" if auto else "⚡ These are"
+    note += " fast approximate contributions (Saabas path attribution)."
+    report = get_registry().get("ivig_model").fast_explanation_error
+    if report:
+        note += (
+            f" Against exact SHAP on {report['n_samples']} reference samples: mean |error| {report['mean_abs_error']:.4f}, "
+            f"{report['relative_error']:.0%} relative error, top-{report['top_k']} features agree {report['top_k_overlap']:.0%}."
+        )
+    return note + " Select **Exact** and predict again for exact SHAP values."
 
 
 def show(model, explainer):
@@ -13,6 +39,7 @@ def show(model, explainer):
     
     col1, col2, col3 = st.columns(3)
     
+    layout = FORM_LAYOUTS["ivig"]
     user_input = {}
     
     with col1:
@@ -22,19 +49,7 @@ def show(model, explainer):
         Results within 3 days prior to the 1st IVIG administration
         </div>
         """, unsafe_allow_html=True)
-        user_input["Lympho_before"] = st.number_input("Lymphocyte (%)", value=None, placeholder="0.00", format="%.2f")
-        user_input["Seg_before"] = st.number_input("Neutrophil (%)", value=None, placeholder="0.00", format="%.2f")
-        user_input["PLT_before"] = st.number_input("Platelet Count (10³/μL)", value=None, placeholder="0.00", format="%.2f")
-        user_input["Chol_before"] = st.number_input("Total Cholesterol (mg/dL)", value=None, placeholder="0.00", format="%.2f")
-        user_input["CRP_before"] = st.number_input("C-Reactive Protein (mg/dL)", value=None, placeholder="0.00", format="%.2f")
-        user_input["TB_before"] = st.number_input("Total Bilirubin (mg/dL)", value=None, placeholder="0.00", format="%.2f")
-        user_input["P_before"] = st.number_input("Phosphorus (mg/dL)", value=None, placeholder="0.00", format="%.2f")
-        user_input["ANC_before"] = st.number_input("Absolute Neutrophil Count (10⁹/L)", value=None, placeholder="0.00", format="%.2f")
-        user_input["Ca_before"] = st.number_input("Calcium (mg/dL)", value=None, placeholder="0.00", format="%.2f")
-        user_input["AST_before"] = st.number_input("Aspartate Aminotransferase (IU/L)", value=None, placeholder="0.00", format="%.2f")
-        user_input["PCT_before"] = st.number_input("Plateletcrit (%)", value=None, placeholder="0.00", format="%.2f")
-        user_input["CO2_before"] = st.number_input("Carbon Dioxide (mEq/L)", value=None, placeholder="0.00", format="%.2f")
-
+        user_input.update(feature_inputs(layout["lab"]))
     
     with col2:
         st.markdown("**Echocardiographic Parameters**")
@@ -43,7 +58,7 @@ def show(model, explainer):
         Initial echocardiography Z-scores calculated using Dallaire and Dahdah nomograms
         </div>
         """, unsafe_allow_html=True)
-        user_input["initial_echo_LAD_Z"] = st.number_input("Left Anterior Descending Z-score", value=None, placeholder="0.00", format="%.2f")
+        user_input.update(feature_inputs(layout["echo"]))
     
     with col3:
         st.markdown("**Model Information**")
@@ -63,46 +78,43 @@ def show(model, explainer):
             </div>
         """, unsafe_allow_html=True)
     
-    ivig_feature_order = [
-        "PLT_before", "Lympho_before", "Seg_before", "Chol_before", "CRP_before", "P_before", 
-        "TB_before", "Ca_before", "AST_before", "PCT_before", "initial_echo_LAD_Z", 
-        "ANC_before", "CO2_before"
-    ]
-    
-    # Feature names mapping for SHAP display
-    feature_names_map = {
-        "PLT_before": "Platelet Count (10³/ml)",
-        "Lympho_before": "Lymphocyte (%)",
-        "Seg_before": "Neutrophil (%)",
-        "Chol_before": "Cholesterol (mg/dL)",
-        "CRP_before": "C-Reactive Protein (mg/dL)",
-        "P_before": "Phosphorus (mg/dL)",
-        "TB_before": "Total Bilirubin (mg/dL)",
-        "Ca_before": "Calcium (mg/dL)",
-        "AST_before": "Aspartate Aminotransferase (IU/L)",
-        "PCT_before": "Plateletcrit (%)",
-        "initial_echo_LAD_Z": "LAD Z Score",
-        "ANC_before": "Absolute Neutrophil Count (10⁹/L)",
-        "CO2_before": "Carbon Dioxide (mEq/L)",
-    }
-    
+    mode = st.radio(
+        "SHAP values", EXPLAIN_MODES, horizontal=True, key="ivig_explain_mode",
+        index=EXPLAIN_MODES.index(DEFAULT_EXPLAIN_MODE) if DEFAULT_EXPLAIN_MODE in EXPLAIN_MODES else 0,
+        help="Auto computes exact SHAP values unless the server is busy, then a fast approximation",
+    )
+
+    # 입력값이나 SHAP 계산 방식이 바뀌면 이전 예측 결과는 표시하지 않음
+    request = st.session_state.get("ivig_request")
+    if request is not None and (request["inputs"] != user_input or request["mode"] != mode):
+        request = st.session_state["ivig_request"] = None
+
     if st.button("Predict IVIG Resistance", type="primary"):
-        # Validate all fields are filled
-        missing_fields = []
-        for field, value in user_input.items():
-            if value is None:
-                missing_fields.append(field)
-        
-        if missing_fields:
-            st.error(f"⚠️ Please fill in all required fields. {len(missing_fields)} field(s) are missing.")
-            st.warning("All laboratory parameters and echocardiographic measurement must be provided.")
+        # 결측값과 허용 범위를 벗어난 값을 한 번에 검사
+        with metrics.stage("ivig.validate"):
+            X_input = validated_frame(user_input, IVIG_FEATURE_ORDER, "All laboratory parameters and echocardiographic measurement must be provided.")
+        if X_input is None:
+            st.stop()
+        if model is None:
+            st.error("Model not loaded properly.")
             st.stop()
+
+        # 예측과 SHAP 계산은 작업 큐의 워커 프로세스에서 실행하고 결과는 캐시에 저장
+        fast = mode == "Fast" or (mode == "Auto" and get_job_queue().overloaded)
+        request = start_prediction("ivig", canonicalize(X_input), user_input, FAST_EXPLAINER if fast else None)
+        if request is not None:
+            request["mode"] = mode
+        st.session_state["ivig_request"] = request
+
+    if request is not None and prediction_ready(request):
+        X_input = request["X"]
+        with metrics.request("ivig"):
+            cache = get_result_cache()
+            registry = get_registry()
+            with metrics.stage("ivig.result_lookup"):
+                pred_prob = cached_probability(cache, "ivig_model", registry.fingerprint("ivig_model"), X_input, model)
+            model_id = ("ivig", registry.fingerprint("ivig_model"))
         
-        if model is not None:
-            X_input = pd.DataFrame([user_input])
-            X_input = X_input[ivig_feature_order]
-            pred_prob = model.predict_proba(X_input)[0, 1]
-            
             col1, col2 = st.columns([1, 1])
             with col1:
                 st.metric(
@@ -110,57 +122,37 @@ def show(model, explainer):
                     value=f"{pred_prob:.1%}",
                     delta=f"{'Resistant' if pred_prob > 0.5 else 'Responsive'}"
                 )
-            
+        
             with col2:
-                if pred_prob > 0.7:
-                    st.error("High resistance likelihood: Consider alternative therapy")
-                elif pred_prob > 0.3:
-                    st.warning("Moderate resistance risk: Enhanced monitoring advised")
-                else:
-                    st.success("Low resistance probability: IVIG likely effective")
-            
+                risk_message.show("ivig", pred_prob)
+        
             if explainer is not None:
                 try:
-                    shap_values = explainer(X_input)
-                    
+                    # 양성 클래스 단일 행 설명으로 캐시됨
+                    explainer_name = request["explainer"]
+                    fast = explainer_name == FAST_EXPLAINER
+                    with metrics.stage("ivig.explain_fast" if fast else "ivig.explain_lookup"):
+                        explainer_obj = registry.get(explainer_name) if fast else explainer
+                        shap_values = cached_explanation(
+                            cache, explainer_name, registry.fingerprint(explainer_name), X_input, explainer_obj
+                        )
+                    # 모집단 SHAP 요약에는 정확한 SHAP 값만 기록
+                    if not fast and not request["recorded"]:
+                        with metrics.stage("ivig.shap_store"):
+                            get_shap_store("ivig").append(shap_values.values, X_input.to_numpy(dtype=float))
+                        request["recorded"] = True
+                
                     # Update feature names for better display
-                    if hasattr(shap_values, 'feature_names') and shap_values.feature_names is not None:
-                        enhanced_names = []
-                        for i, name in enumerate(shap_values.feature_names):
-                            readable_name = feature_names_map.get(name, name)
-                            enhanced_names.append(readable_name)
-                        shap_values.feature_names = enhanced_names
-                    
+                    shap_values.feature_names = display_names(shap_values.feature_names)
+                
                     st.write("---")
                     st.subheader("Feature Importance Analysis")
+                    if fast:
+                        st.info(fast_explanation_note(auto=request["mode"] == "Auto"))
+                
+                    shap_charts.show(shap_values, (*model_id, explainer_name), X_input, max_display=14)
                     
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write("**Waterfall Plot**")
-                        fig2, ax2 = plt.subplots(figsize=(12, 8))
-                        plt.rcParams.update({'font.size': 10})
-                        if len(shap_values[0].shape) > 1:
-                            shap.plots.waterfall(shap_values[0, :, 1], max_display=14, show=False)
-                        else:
-                            shap.plots.waterfall(shap_values[0], max_display=14, show=False)
-                        plt.tight_layout()
-                        st.pyplot(fig2)
-                        plt.close(fig2)
-                    
-                    with col2:
-                        st.write("**Feature Importance (Bar Chart)**")
-                        fig4, ax4 = plt.subplots(figsize=(12, 8))
-                        plt.rcParams.update({'font.size': 10})
-                        if len(shap_values[0].shape) > 1:
-                            shap.plots.bar(shap_values[0, :, 1], max_display=14, show=False)
-                        else:
-                            shap.plots.bar(shap_values[0], max_display=14, show=False)
-                        plt.tight_layout()
-                        st.pyplot(fig4)
-                        plt.close(fig4)
-                        
                 except Exception as e:
                     st.error(f"SHAP analysis error: {str(e)}")
-        else:
-            st.error("Model not loaded properly.") 
+
+            sensitivity.show("ivig", model, model_id, X_input, pred_prob)
@@ -0,0 +1,129 @@
+import uuid
+
+import streamlit as st
+
+from utils.combined import artifact_model, artifacts, project
+from utils.jobs import CANCELLED, DONE, FAILED, QueueFull, combined_task, observe_timings, predict_explain_task
+from utils.model_loader import get_job_queue, get_registry, get_result_cache
+
+
+# 진행률을 다시 그리는 주기 (해당 fragment 만 다시 실행)
+POLL_SECONDS = 0.5
+# 수 ms 면 끝나는 근사 explainer 는 큐에 넣지 않고 페이지에서 바로 계산
+INLINE_EXPLAINERS = {"ivig_fast_explainer"}
+
+
+def session_owner():
+    """Stable id of this browser session, used for fair scheduling between sessions"""
+    if "job_owner" not in st.session_state:
+        st.session_state.job_owner = uuid.uuid4().hex
+    return st.session_state.job_owner
+
+
+def submit(kind, task, chunks, label):
+    """Submit a job for this session; shows a warning and returns None when the session is at its limit"""
+    try:
+        return get_job_queue().submit(session_owner(), kind, task, chunks, label=label)
+    except QueueFull as e:
+        st.warning(f"⚠️ {e}. Wait for them to finish or cancel one.")
+        return None
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def progress(job_id):
+    """Progress bar and cancel button; reruns the page once the job has finished"""
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    if job is None or job.done:
+        st.rerun()
+
+    status = "waiting for a worker" if job.started_at is None else f"running {job.run_seconds:.1f}s"
+    st.progress(job.progress, text=f"{job.label}: {status} ({job.completed}/{job.total})")
+    if st.button("Cancel", key=f"cancel_job_{job_id}"):
+        queue.cancel(job_id)
+        st.rerun()
+
+
+def finished(job_id):
+    """Return the finished Job, or None after showing progress / the failure message"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        st.warning("⚠️ The job is no longer available. Please run it again.")
+        return None
+    if job.status == DONE:
+        return job
+    if job.status == FAILED:
+        st.error(f"❌ Job failed: {job.error}")
+    elif job.status == CANCELLED:
+        st.info("Job cancelled.")
+    else:
+        progress(job_id)
+    return None
+
+
+def start_prediction(model_name, X_input, inputs, explainer=None):
+    """Queue probability + SHAP for one canonical patient unless both are already cached.
+
+    ``explainer`` is the explainer artifact (default ``<model>_explainer``);
+    fast ones in INLINE_EXPLAINERS are computed by the page instead. Returns
+    the request dict kept in session state, or None if the job could not
+    be queued.
+    """
+    cache = get_result_cache()
+    registry = get_registry()
+    explainer = explainer or f"{model_name}_explainer"
+    request = {"inputs": inputs, "X": X_input, "explainer": explainer, "job": None, "recorded": False}
+    if explainer in INLINE_EXPLAINERS:
+        return request
+    artifacts = (f"{model_name}_model", explainer)
+    if all(cache.get(name, registry.fingerprint(name), X_input) is not None for name in artifacts):
+        return request
+
+    job = submit(f"{model_name}.predict", predict_explain_task, [(model_name, X_input)], "Calculating prediction")
+    if job is None:
+        return None
+    request["job"] = job.id
+    return request
+
+
+def start_assessment(X_input, inputs):
+    """Queue both models' probabilities + SHAP for one canonical combined row unless all are cached.
+
+    Results are cached under each model's own feature vector, so they are
+    shared with the single-model pages. Returns the request dict kept in
+    session state, or None if the job could not be queued.
+    """
+    cache = get_result_cache()
+    registry = get_registry()
+    # recorded: 모집단 SHAP 요약에 이미 기록한 모델
+    request = {"inputs": inputs, "X": X_input, "job": None, "recorded": set()}
+    if all(
+        cache.get(name, registry.fingerprint(name), project(X_input, artifact_model(name))) is not None
+        for name in artifacts()
+    ):
+        return request
+
+    job = submit("combined.predict", combined_task, [X_input], "Calculating both predictions")
+    if job is None:
+        return None
+    request["job"] = job.id
+    return request
+
+
+def prediction_ready(request):
+    """True once the request's results are in the result cache (stores the job's results there)"""
+    if request["job"] is None:
+        return True
+    job = finished(request["job"])
+    if job is None:
+        return False
+
+    result = job.results[0]
+    # 워커에서 측정한 predict_proba / explain 시간을 이 프로세스의 지표로 기록
+    observe_timings(result)
+    cache = get_result_cache()
+    for name, fingerprint in result["fingerprints"].items():
+        # 통합 평가의 입력은 모델별 변수 순서로 나누어 저장
+        cache.put(name, fingerprint, project(request["X"], artifact_model(name)), result[name])
+    request["job"] = None
+    return True
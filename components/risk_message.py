@@ -0,0 +1,13 @@
+import streamlit as st
+
+from utils.risk import RISK_LEVELS, risk_category
+
+
+# 위험도별 표시 형식 (문구는 utils/risk.py 의 RISK_LEVELS 에서 가져옴)
+RISK_STYLES = {"high": st.error, "moderate": st.warning, "low": st.success}
+
+
+def show(model_name, prob):
+    """Colored recommendation for a predicted probability"""
+    risk = risk_category(prob)
+    RISK_STYLES[risk](RISK_LEVELS[model_name][risk][1])
@@ -0,0 +1,69 @@
+import numpy as np
+import streamlit as st
+
+from utils.features import FEATURES
+from utils.metrics import metrics
+from utils.model_loader import get_registry, get_result_cache
+from utils.plots import plot_cache, plot_key, sensitivity_curve_spec, sensitivity_heatmap_spec
+from utils.sensitivity import CURVE_POINTS, HEATMAP_POINTS, cached_sweep, feature_axis
+
+
+def _label(name):
+    return "—" if name is None else FEATURES[name].display_name
+
+
+def _axis(model_name, name, points):
+    """Grid of one feature over the range chosen with its slider (default: the schema range)"""
+    spec = FEATURES[name]
+    if spec.choices:
+        return feature_axis(name, points)
+    low, high = st.slider(
+        f"Range of {spec.display_name}", float(spec.low), float(spec.high),
+        (float(spec.low), float(spec.high)), key=f"{model_name}_whatif_range_{name}",
+    )
+    return feature_axis(name, points, low, high)
+
+
+def show(model_name, model, model_id, X_input, pred_prob):
+    """Risk curve (one feature) or heatmap (two features) for the current patient.
+
+    Every other input stays as entered; the grid is scored with one
+    ``predict_proba`` call and cached per patient vector, model version and
+    grid, and timed as the ``<model>.sensitivity`` stage.
+    """
+    st.write("---")
+    st.subheader("What-if Sensitivity")
+    st.caption("How the predicted risk changes when one or two inputs are varied and all others are kept as entered")
+
+    names = list(X_input.columns)
+    col1, col2 = st.columns(2)
+    first = col1.selectbox("Vary", names, format_func=_label, key=f"{model_name}_whatif_first")
+    second = col2.selectbox(
+        "Together with (optional)", [None, *[n for n in names if n != first]],
+        format_func=_label, key=f"{model_name}_whatif_second",
+    )
+    features = [first] if second is None else [first, second]
+    points = CURVE_POINTS if second is None else HEATMAP_POINTS
+    axes = [_axis(model_name, name, points) for name in features]
+
+    registry = get_registry()
+    artifact = f"{model_name}_model"
+    with metrics.stage(f"{model_name}.sensitivity"):
+        result = cached_sweep(get_result_cache(), artifact, registry.fingerprint(artifact), X_input, model, features, axes)
+
+    probability = np.asarray(result["probability"])
+    current = [float(X_input[name].iloc[0]) for name in features]
+    titles = [FEATURES[name].display_name for name in features]
+    labels = [FEATURES[name].choices for name in features]
+    key = plot_key(model_id, X_input, "sensitivity", result["features"], result["axes"])
+    if second is None:
+        build = lambda: sensitivity_curve_spec(axes[0], probability, (current[0], pred_prob), titles[0], labels[0])
+        marker = "current patient marked, dashed lines: risk thresholds"
+    else:
+        build = lambda: sensitivity_heatmap_spec(axes, probability, current, titles, labels)
+        marker = "current patient marked with ✚"
+    st.vega_lite_chart(plot_cache.get_or_render(key, build), width="stretch")
+    st.caption(
+        f"Predicted probability ranges from {probability.min():.1%} to {probability.max():.1%} "
+        f"over {probability.size:,} scored combinations ({marker})"
+    )
@@ -0,0 +1,45 @@
+import streamlit as st
+
+from utils.metrics import metrics
+from utils.plots import bar_spec, matplotlib_png, plot_cache, plot_key, waterfall_spec
+
+
+def backend_toggle():
+    """Sidebar switch between interactive (Vega-Lite) and static (matplotlib) charts"""
+    st.sidebar.toggle("Interactive SHAP charts", value=True, key="shap_interactive")
+
+
+def show(explanation, model_id, X_input, max_display):
+    """Display the waterfall and bar charts for a single-row SHAP explanation.
+
+    Charts are cached by model identity and input vector, so reruns and
+    repeat views skip rendering. Interactive Vega-Lite charts are the
+    default; the static matplotlib renderer remains available as a fallback.
+    Rendering and sending the chart to the browser are timed as the
+    ``<model>.render`` and ``<model>.serialize`` stages.
+    """
+    backend = "vega" if st.session_state.get("shap_interactive", True) else "matplotlib"
+    prefix = model_id[0]
+
+    col1, col2 = st.columns(2)
+    for col, kind, title, build in [
+        (col1, "waterfall", "**Waterfall Plot**", waterfall_spec),
+        (col2, "bar", "**Feature Importance (Bar Chart)**", bar_spec),
+    ]:
+        with col:
+            st.write(title)
+            key = plot_key(model_id, X_input, kind, backend, max_display)
+            if backend == "vega":
+                try:
+                    with metrics.stage(f"{prefix}.render"):
+                        spec = plot_cache.get_or_render(key, lambda: build(explanation, max_display))
+                    with metrics.stage(f"{prefix}.serialize"):
+                        st.vega_lite_chart(spec, width="stretch")
+                    continue
+                except Exception:
+                    # Vega-Lite 렌더링 실패 시 matplotlib 으로 대체
+                    key = plot_key(model_id, X_input, kind, "matplotlib", max_display)
+            with metrics.stage(f"{prefix}.render"):
+                png = plot_cache.get_or_render(key, lambda: matplotlib_png(explanation, kind, max_display))
+            with metrics.stage(f"{prefix}.serialize"):
+                st.image(png)
@@ -0,0 +1,58 @@
+import pandas as pd
+import streamlit as st
+
+from utils.features import FEATURE_ORDERS, display_names
+from utils.model_loader import get_shap_store
+from utils.plots import beeswarm_spec, dependence_spec, mean_abs_spec
+
+
+MODEL_OPTIONS = {
+    "caa": "Coronary Aneurysm (CatBoost)",
+    "ivig": "IVIG Resistance (RandomForest)",
+}
+
+
+def show():
+    """Display population-level SHAP summaries over all recorded predictions"""
+    st.title("SHAP Summary")
+    st.write("*Global feature effects across every patient explained by this server*")
+
+    model_name = st.radio(
+        "Model", list(MODEL_OPTIONS), format_func=MODEL_OPTIONS.get, horizontal=True
+    )
+    store = get_shap_store(model_name)
+    # 집계값만 읽으므로 기록된 예측 수와 관계없이 일정한 시간에 표시
+    summary = store.summary()
+    if summary["count"] == 0:
+        st.info("No explained predictions recorded yet. Run a prediction or score a cohort with SHAP enabled.")
+        return
+
+    names = display_names(FEATURE_ORDERS[model_name])
+    shap_sample, data_sample = store.sample()
+
+    col1, col2 = st.columns(2)
+    col1.metric("Predictions recorded", f"{summary['count']:,}")
+    col2.metric("Plotted sample", f"{len(shap_sample):,}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**Mean |SHAP| (all predictions)**")
+        st.vega_lite_chart(mean_abs_spec(names, summary["mean_abs"]), width="stretch")
+    with col2:
+        st.write("**Beeswarm (sample)**")
+        st.vega_lite_chart(
+            beeswarm_spec(names, shap_sample, data_sample, summary["mean_abs"]), width="stretch"
+        )
+
+    st.write("**Dependence Plot (sample)**")
+    feature = st.selectbox("Feature", range(len(names)), format_func=lambda j: names[j])
+    st.vega_lite_chart(
+        dependence_spec(names[feature], data_sample[:, feature], shap_sample[:, feature]),
+        width="stretch",
+    )
+
+    st.write("**Per-feature statistics (all predictions)**")
+    table = pd.DataFrame({"feature": names, "mean": summary["mean"], "mean |SHAP|": summary["mean_abs"]})
+    for q, values in summary["quantiles"].items():
+        table[f"p{q * 100:g}"] = values
+    st.dataframe(table.sort_values("mean |SHAP|", ascending=False), hide_index=True)
@@ -0,0 +1,279 @@
+"""Pickle-free model artifacts.
+
+An artifact is a directory holding the model in a native, data-only
+format plus a ``manifest.json``:
+
+* ``catboost``: ``model.cbm`` (CatBoost's own binary format) and, for
+  symmetric trees, the SHAP lookup tables as ``shap_*.npy``
+* ``compiled_forest``: flat ``.npy`` node arrays (see ``utils.compiled_forest``)
+
+The manifest records the format, feature order, classes, the library
+versions used to export the model and a SHA-256 checksum of every file.
+Loading verifies the checksums (a file is not re-read while its mtime and
+size are unchanged) and never unpickles anything; forest arrays and SHAP
+tables are memory-mapped so worker processes share one copy.
+
+Package a trained model (the pickle is only read at export time):
+
+    python -m utils.artifacts models/caa_model.pkl models/caa_model
+    python -m utils.artifacts models/ivig_model.pkl models/ivig_forest
+"""
+import json
+import os
+import pickle
+import platform
+import sys
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+from utils.model_registry import file_sha256
+
+
+MANIFEST = "manifest.json"
+CATBOOST_FILE = "model.cbm"
+SHAP_TABLE_PREFIX = "shap_"
+
+# 이 프로세스에서 이미 검증한 파일: 경로 -> (mtime, 크기, SHA-256)
+_verified = {}
+
+
+class ArtifactError(ValueError):
+    """Raised when an artifact directory is incomplete, tampered with or of unknown format"""
+
+
+def library_versions(*packages):
+    versions = {"python": platform.python_version()}
+    for package in packages:
+        versions[package] = metadata.version(package)
+    return versions
+
+
+def write_manifest(directory, artifact_format, files, **fields):
+    """Checksum ``files`` (names inside ``directory``) and write the manifest"""
+    manifest = {
+        "format": artifact_format,
+        "files": {name: file_sha256(os.path.join(directory, name)) for name in files},
+        **fields,
+    }
+    with open(os.path.join(directory, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(directory, verify=True):
+    """Read the manifest of ``directory`` and check every file against its checksum"""
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    with open(path) as f:
+        manifest = json.load(f)
+
+    if verify:
+        for name, expected in manifest["files"].items():
+            file_path = os.path.join(directory, name)
+            if not os.path.exists(file_path):
+                raise ArtifactError(f"{file_path} is listed in the manifest but missing")
+            if _file_checksum(file_path) != expected:
+                raise ArtifactError(f"Checksum mismatch for {file_path}")
+    return manifest
+
+
+def _file_checksum(path):
+    """SHA-256 of ``path``; not re-read while its mtime and size are unchanged"""
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _verified.get(path)
+    if cached is not None and cached[:2] == stamp:
+        return cached[2]
+    sha256 = file_sha256(path)
+    _verified[path] = (*stamp, sha256)
+    return sha256
+
+
+def export_catboost(model, directory):
+    """Save a CatBoost model as ``model.cbm`` plus its SHAP lookup tables and manifest"""
+    from utils.explain import ObliviousTreeShapExplainer
+
+    os.makedirs(directory, exist_ok=True)
+    model.save_model(os.path.join(directory, CATBOOST_FILE), format="cbm")
+    files = [CATBOOST_FILE]
+    fields = {}
+    try:
+        tables = ObliviousTreeShapExplainer.build_tables(model)
+    except ValueError:
+        # lookup table 로 표현할 수 없는 모델: 설명 시 CatBoost ShapValues 사용
+        tables = None
+    if tables is not None:
+        fields["shap_expected_value"] = tables.pop("expected_value")
+        for name, array in tables.items():
+            file_name = f"{SHAP_TABLE_PREFIX}{name}.npy"
+            np.save(os.path.join(directory, file_name), np.ascontiguousarray(array), allow_pickle=False)
+            files.append(file_name)
+    return write_manifest(
+        directory,
+        "catboost",
+        files,
+        feature_names=list(model.feature_names_),
+        cat_features=[int(i) for i in model.get_cat_feature_indices()],
+        classes=[c.item() if hasattr(c, "item") else c for c in model.classes_],
+        libraries=library_versions("catboost"),
+        **fields,
+    )
+
+
+def load_shap_tables(directory, manifest, mmap=True):
+    """SHAP lookup tables stored by ``export_catboost``, or None if the artifact has none"""
+    if "shap_expected_value" not in manifest:
+        return None
+    mode = "r" if mmap else None
+    tables = {
+        name[len(SHAP_TABLE_PREFIX):-len(".npy")]: np.load(os.path.join(directory, name), mmap_mode=mode, allow_pickle=False)
+        for name in manifest["files"] if name.startswith(SHAP_TABLE_PREFIX)
+    }
+    tables["expected_value"] = manifest["shap_expected_value"]
+    return tables
+
+
+def load_artifact(directory, mmap=True, verify=True):
+    """Load a packaged model; forest arrays and SHAP tables are memory-mapped unless ``mmap=False``"""
+    manifest = read_manifest(directory, verify=verify)
+    artifact_format = manifest.get("format")
+
+    if artifact_format == "catboost":
+        from catboost import CatBoostClassifier
+        # CatBoost 는 자체 포맷을 직접 읽으므로 memory-map 을 지원하지 않음
+        model = CatBoostClassifier().load_model(os.path.join(directory, CATBOOST_FILE), format="cbm")
+        # explainer 생성 시 테이블을 다시 계산하지 않도록 모델과 함께 전달 (utils.explain.catboost_explainer)
+        model.shap_tables = load_shap_tables(directory, manifest, mmap=mmap)
+        return model
+    if artifact_format == "compiled_forest":
+        from utils.compiled_forest import CompiledForest
+        return CompiledForest.from_manifest(directory, manifest, mmap=mmap)
+    raise ArtifactError(f"Unknown artifact format {artifact_format!r} in {directory}")
+
+
+def forest_explainer(forest):
+    """Exact tree_path_dependent shap.TreeExplainer built from compiled forest arrays.
+
+    Uses the node weights (training samples per node) stored with the
+    forest, so no sklearn object or pickled explainer is needed. Matches
+    ``shap.TreeExplainer(RandomForestClassifier)``.
+    """
+    import shap
+
+    trees = []
+    bounds = np.append(forest.roots, len(forest.left))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        is_leaf = forest.left[start:end] == -1
+        left = np.where(is_leaf, -1, forest.left[start:end] - start)
+        right = np.where(is_leaf, -1, forest.right[start:end] - start)
+        trees.append({
+            "children_left": left,
+            "children_right": right,
+            "children_default": np.where(forest.missing_left[start:end], left, right),
+            "features": np.where(is_leaf, -2, forest.feature[start:end]),
+            "thresholds": np.asarray(forest.threshold[start:end], dtype=np.float64),
+            # sklearn 과 같이 트리 평균이 되도록 트리 수로 나눔
+            "values": np.asarray(forest.value[start:end]) / forest.n_trees,
+            "node_sample_weight": np.asarray(forest.weight[start:end], dtype=np.float64),
+        })
+    return shap.TreeExplainer({
+        "trees": trees,
+        "input_dtype": np.float32,  # sklearn 은 입력을 float32 로 비교
+        "internal_dtype": np.float64,
+        "tree_output": "probability",
+    })
+
+
+def path_attribution_error(forest, exact, n_samples=500, top_k=5, seed=0):
+    """Error of ``PathAttributionExplainer`` against the exact explainer (positive class).
+
+    Measured on ``parity_sample`` rows (values around the split thresholds).
+    ``relative_error`` is sum |fast - exact| / sum |exact|; ``top_k_overlap``
+    is the mean share of the exact top-k features (by |SHAP|) that the fast
+    explanation also ranks in its top k.
+    """
+    from utils.compiled_forest import PathAttributionExplainer, parity_sample
+
+    X = parity_sample(forest, n_samples, seed=seed)
+    expected = np.asarray(exact(X).values)[:, :, 1]
+    approx = np.asarray(PathAttributionExplainer(forest)(X).values)[:, :, 1]
+    error = np.abs(approx - expected)
+    k = min(top_k, expected.shape[1])
+    top_expected = np.argsort(-np.abs(expected), axis=1)[:, :k]
+    top_approx = np.argsort(-np.abs(approx), axis=1)[:, :k]
+    overlap = [len(set(a) & set(b)) / k for a, b in zip(top_expected, top_approx)]
+    return {
+        "method": "saabas",
+        "n_samples": n_samples,
+        "mean_abs_error": float(error.mean()),
+        "max_abs_error": float(error.max()),
+        "relative_error": float(error.sum() / np.abs(expected).sum()),
+        "top_k": k,
+        "top_k_overlap": float(np.mean(overlap)),
+    }
+
+
+def update_manifest(directory, **fields):
+    """Add fields that do not change any file (e.g. measured accuracy) to the manifest"""
+    manifest = read_manifest(directory, verify=False)
+    manifest.update(fields)
+    with open(os.path.join(directory, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv):
+    if len(argv) != 2:
+        print("usage: python -m utils.artifacts <model.pkl> <output_dir>")
+        return 2
+    source, directory = argv
+    # 신뢰할 수 있는 학습 결과물에서 내보낼 때만 pickle 을 읽음
+    with open(source, "rb") as f:
+        model = pickle.load(f)
+
+    if hasattr(model, "estimators_"):
+        from utils.compiled_forest import check_parity, export_forest, parity_sample
+
+        manifest = export_forest(model, directory)
+        print(f"Exported {manifest['n_trees']} trees / {manifest['n_nodes']} nodes to {directory}")
+        forest = load_artifact(directory)
+        X = parity_sample(forest, 5000)
+        ok = check_parity(model, forest, X)
+        if ok:
+            report = path_attribution_error(forest, forest_explainer(forest))
+            update_manifest(directory, fast_explanation_error=report)
+            print(
+                f"Fast explanation error vs exact SHAP: mean |error| {report['mean_abs_error']:.4f}, "
+                f"relative {report['relative_error']:.1%}, top-{report['top_k']} overlap {report['top_k_overlap']:.0%}"
+            )
+    else:
+        export_catboost(model, directory)
+        print(f"Exported {type(model).__name__} to {directory}")
+        packaged = load_artifact(directory)
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.uniform(0, 100, (5000, len(model.feature_names_))), columns=model.feature_names_)
+        for j in model.get_cat_feature_indices():
+            X[X.columns[j]] = rng.integers(0, 2, len(X))
+        ok = np.array_equal(model.predict_proba(X), packaged.predict_proba(X))
+        if ok and packaged.shap_tables is not None:
+            from utils.explain import ObliviousTreeShapExplainer
+
+            # 저장된 테이블로 만든 explainer 가 pickle 모델에서 새로 만든 것과 같은 값을 내는지 확인
+            stored = ObliviousTreeShapExplainer(packaged, packaged.shap_tables)(X)
+            rebuilt = ObliviousTreeShapExplainer(model)(X)
+            ok = np.array_equal(stored.values, rebuilt.values) and stored.base_values[0] == rebuilt.base_values[0]
+            if ok:
+                print(f"Stored {len(packaged.shap_tables) - 1} SHAP lookup tables (identical SHAP values)")
+
+    if not ok:
+        print("❌ Parity check failed: packaged model differs from the pickle")
+        return 1
+    print(f"✅ Parity check passed (identical predict_proba on {len(X):,} samples)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
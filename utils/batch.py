@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from utils.features import error_messages, validate
+from utils.risk import HIGH_RISK_THRESHOLD, MODERATE_RISK_THRESHOLD, RISK_LEVELS
+
+
+DEFAULT_CHUNK_SIZE = 50_000
+DEFAULT_EXPLAIN_CHUNK_SIZE = 1_000
+
+
+def read_table(file, filename):
+    """Read an uploaded CSV or XLSX file into a DataFrame (raises ValueError for legacy .xls)"""
+    name = filename.lower()
+    # openpyxl 은 .xlsx 만 읽을 수 있음
+    if name.endswith(".xls"):
+        raise ValueError("Legacy .xls files are not supported; save the file as .xlsx or CSV")
+    if name.endswith(".xlsx"):
+        return pd.read_excel(file, engine="openpyxl")
+    return pd.read_csv(file)
+
+
+def prepare_features(df, feature_order):
+    """Reorder columns to the model's feature order and flag unusable rows.
+
+    Returns the numeric feature matrix and a Series holding a per-row error
+    message (empty string for valid rows). Raises ValueError when required
+    columns are missing from the file.
+    """
+    missing_columns = [c for c in feature_order if c not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+
+    X = df[feature_order].apply(pd.to_numeric, errors="coerce")
+
+    # 결측/숫자가 아닌 값, 범위를 벗어난 값을 행 단위로 보고
+    missing, out_of_range = validate(X, feature_order)
+    errors = pd.Series(error_messages(missing, out_of_range, feature_order), index=df.index, dtype=object)
+
+    return X, errors
+
+
+def risk_columns(model_name, probs):
+    """Vectorized risk_level and recommendation columns for an array of probabilities"""
+    levels = RISK_LEVELS[model_name]
+    conditions = [probs > HIGH_RISK_THRESHOLD, probs > MODERATE_RISK_THRESHOLD]
+    risk_level = np.select(conditions, [levels["high"][0], levels["moderate"][0]], levels["low"][0])
+    recommendation = np.select(conditions, [levels["high"][1], levels["moderate"][1]], levels["low"][1])
+    return risk_level, recommendation
+
+
+def predict_in_chunks(model, X, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return positive-class probabilities, calling predict_proba once per chunk.
+
+    For IVIG this is the compiled forest, about 3x slower than sklearn on
+    large chunks (see ``benchmarks/bench_ivig_forest.py``).
+    """
+    probs = np.empty(len(X), dtype=float)
+    for start in range(0, len(X), chunk_size):
+        chunk = X.iloc[start:start + chunk_size]
+        probs[start:start + len(chunk)] = model.predict_proba(chunk)[:, 1]
+    return probs
+
+
+def assemble_scored(df, model_name, errors, probs, elapsed):
+    """Add probability, risk and error columns to ``df``; ``probs`` is NaN for invalid rows"""
+    valid = (errors == "").to_numpy()
+    risk_level, recommendation = risk_columns(model_name, probs)
+    scored = df.copy()
+    scored["probability"] = probs
+    scored["risk_level"] = np.where(valid, risk_level, "")
+    scored["recommendation"] = np.where(valid, recommendation, "")
+    scored["error"] = errors
+
+    summary = {
+        "rows": len(df),
+        "scored": int(valid.sum()),
+        "errors": int((~valid).sum()),
+        "seconds": elapsed,
+        "rows_per_sec": len(df) / elapsed if elapsed > 0 else float("inf"),
+    }
+    return scored, summary
+
+
+def explain_rows(explainer, X, chunk_size=DEFAULT_EXPLAIN_CHUNK_SIZE):
+    """Positive-class SHAP values of an already validated feature frame"""
+    values = np.empty(X.shape)
+    for start in range(0, len(X), chunk_size):
+        chunk = np.asarray(explainer(X.iloc[start:start + chunk_size]).values)
+        if chunk.ndim == 3:
+            # RandomForest explainer 는 클래스별 값을 반환하므로 양성 클래스만 사용
+            chunk = chunk[:, :, 1]
+        values[start:start + len(chunk)] = chunk
+    return values
@@ -0,0 +1,161 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+import pandas as pd
+
+
+DEFAULT_MAX_BATCH_SIZE = int(os.environ.get("KD_MAX_BATCH_SIZE", 64))
+DEFAULT_MAX_WAIT_MS = float(os.environ.get("KD_MAX_WAIT_MS", 2.0))
+# 결과를 기다리는 최대 시간 (dispatcher 에 문제가 생겨도 호출자가 무한히 멈추지 않도록)
+DEFAULT_TIMEOUT_SECONDS = float(os.environ.get("KD_BATCH_TIMEOUT_SECONDS", 60))
+
+
+class MicroBatcher:
+    """Coalesce concurrent small requests into one vectorized call.
+
+    ``fn`` takes a DataFrame and returns something sliceable along the first
+    axis (a predict_proba array or a shap.Explanation). Requests are gathered
+    until ``max_batch_size`` rows are queued or ``max_wait_ms`` has passed
+    since the first one arrived, then run as a single batch and the results
+    are sliced back to each caller. A failing batch fails every request in
+    it; the dispatcher thread keeps running.
+    """
+
+    def __init__(self, fn, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                 timeout=DEFAULT_TIMEOUT_SECONDS):
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # 배치 크기 히스토그램 (2의 거듭제곱 구간)
+        self._buckets = [1]
+        while self._buckets[-1] < max_batch_size:
+            self._buckets.append(self._buckets[-1] * 2)
+        self._histogram = [0] * len(self._buckets)
+        self._batches = 0
+        self._requests = 0
+        self._rows = 0
+        self._errors = 0
+
+    def submit(self, X):
+        """Queue a DataFrame of one or more rows and return a Future for its result"""
+        future = Future()
+        self._ensure_started()
+        self._queue.put((X, future))
+        return future
+
+    def __call__(self, X):
+        """Result for ``X``; raises TimeoutError after ``timeout`` seconds"""
+        return self.submit(X).result(timeout=self.timeout)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            try:
+                self._gather(items)
+                self._dispatch(items)
+            except Exception as e:
+                # 예상하지 못한 오류: 남은 요청을 오류로 완료하고 스레드는 계속 실행
+                self._fail(items, e)
+
+    def _gather(self, items):
+        rows = len(items[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            rows += len(item[0])
+
+    def _fail(self, items, error):
+        with self._lock:
+            self._errors += 1
+        for _, future in items:
+            try:
+                future.set_exception(error)
+            except InvalidStateError:
+                # 이미 완료되었거나 호출자가 취소한 요청
+                pass
+
+    def _dispatch(self, items):
+        items = [(X, f) for X, f in items if f.set_running_or_notify_cancel()]
+        if not items:
+            return
+
+        # 입력 결합, 실행, 호출자별 분할 중 어디서 실패해도 모든 요청에 오류 전달
+        try:
+            if len(items) == 1:
+                batch = items[0][0]
+            else:
+                batch = pd.concat([X for X, _ in items], ignore_index=True)
+            result = self.fn(batch)
+            parts, offset = [], 0
+            for X, _ in items:
+                parts.append(result[offset:offset + len(X)])
+                offset += len(X)
+        except Exception as e:
+            self._fail(items, e)
+            return
+
+        for (_, future), part in zip(items, parts):
+            future.set_result(part)
+
+        with self._lock:
+            self._batches += 1
+            self._requests += len(items)
+            self._rows += len(batch)
+            bucket = next(i for i, b in enumerate(self._buckets) if len(batch) <= b or b == self._buckets[-1])
+            self._histogram[bucket] += 1
+
+    def stats(self):
+        """Return queue depth, counters and the batch-size histogram"""
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "requests": self._requests,
+                "rows": self._rows,
+                "errors": self._errors,
+                "mean_batch_size": self._rows / self._batches if self._batches else 0.0,
+                "batch_size_histogram": {f"<={b}": n for b, n in zip(self._buckets, self._histogram)},
+            }
+
+
+class BatchedModel:
+    """predict_proba facade that routes calls through a MicroBatcher"""
+
+    def __init__(self, batcher):
+        self.batcher = batcher
+
+    def predict_proba(self, X):
+        return self.batcher(X)
+
+
+def registry_batchers(registry, model_name, **kwargs):
+    """Create predict and explain batchers that always use the registry's current artifacts"""
+    model_key = f"{model_name}_model"
+    explainer_key = f"{model_name}_explainer"
+    return {
+        model_key: MicroBatcher(lambda X: registry.get(model_key).predict_proba(X), **kwargs),
+        explainer_key: MicroBatcher(lambda X: registry.get(explainer_key)(X), **kwargs),
+    }
@@ -0,0 +1,63 @@
+"""Assess coronary aneurysm and IVIG resistance for one patient in a single pass.
+
+The two models share five inputs (``SHARED_FEATURES``), so a patient is
+entered once as a row in ``COMBINED_FEATURE_ORDER`` and projected to each
+model's column order. Both probabilities and both SHAP explanations are
+then computed one after another in the calling thread (about 20 ms per
+patient), which in the app is a job-queue worker.
+"""
+import time
+
+from utils.features import FEATURE_ORDERS
+from utils.result_cache import explanation_result, probability_result
+
+
+MODELS = ("caa", "ivig")
+
+
+def project(X, model_name):
+    """Columns of the combined frame ``X`` in the feature order of ``model_name``"""
+    return X[FEATURE_ORDERS[model_name]]
+
+
+def artifact_model(artifact):
+    """Model name of an artifact name (``caa_explainer`` -> ``caa``)"""
+    return artifact.split("_", 1)[0]
+
+
+def artifacts(explain=True):
+    """Artifacts evaluated by a combined assessment"""
+    kinds = ("model", "explainer") if explain else ("model",)
+    return [f"{model_name}_{kind}" for model_name in MODELS for kind in kinds]
+
+
+def stage_name(artifact):
+    """Metrics stage of an artifact (``caa_model`` -> ``caa.predict_proba``), as on the single-model pages"""
+    model_name = artifact_model(artifact)
+    return f"{model_name}.explain" if artifact.endswith("_explainer") else f"{model_name}.predict_proba"
+
+
+def _evaluate(registry, artifact, X):
+    """(result, seconds) of one artifact"""
+    start = time.perf_counter()
+    if artifact.endswith("_explainer"):
+        result = explanation_result(registry.get(artifact), X)
+    else:
+        result = probability_result(registry.get(artifact), X)
+    return result, time.perf_counter() - start
+
+
+def assess(registry, X, explain=True):
+    """Probabilities (and SHAP explanations) of both models for one canonical combined row.
+
+    Returns ``{artifact: result, "timings": {stage: seconds}, "fingerprints":
+    {artifact: sha}}``, the same layout as ``utils.jobs.predict_explain_task``.
+    """
+    frames = {artifact: project(X, artifact_model(artifact)) for artifact in artifacts(explain)}
+    evaluated = {artifact: _evaluate(registry, artifact, frame) for artifact, frame in frames.items()}
+    result = {artifact: value for artifact, (value, _) in evaluated.items()}
+    # 워커 프로세스에서 실행될 수 있으므로 단계별 시간은 결과로 돌려줌
+    result["timings"] = {stage_name(artifact): seconds for artifact, (_, seconds) in evaluated.items()}
+    # 결과를 캐시에 넣을 때 사용한 모델 버전을 키로 사용
+    result["fingerprints"] = {artifact: registry.fingerprint(artifact) for artifact in frames}
+    return result
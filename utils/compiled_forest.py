@@ -0,0 +1,256 @@
+"""Flat NumPy representation of a fitted sklearn RandomForestClassifier.
+
+All trees are concatenated into contiguous node arrays (feature, threshold,
+left, right, value) saved as individual ``.npy`` files, so they can be
+memory-mapped and shared between worker processes. ``CompiledForest``
+evaluates every tree for every row with vectorized NumPy operations and
+reproduces sklearn's ``predict_proba`` bit for bit.
+
+The directory is a ``compiled_forest`` artifact (see ``utils.artifacts``).
+Export from the repository root:
+
+    python -m utils.artifacts models/ivig_model.pkl models/ivig_forest
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.artifacts import library_versions, read_manifest, write_manifest
+
+
+ARRAYS = ("feature", "threshold", "left", "right", "missing_left", "value", "weight", "roots", "children")
+CHUNK_ROWS = 256
+
+
+def export_forest(model, directory):
+    """Write the trees of ``model`` as flat node arrays plus a JSON manifest"""
+    features, thresholds, lefts, rights, missing_lefts, values, weights, roots = [], [], [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+
+        # sklearn 과 동일하게 노드별 클래스 비율을 정규화
+        value = tree.value[:, 0, :].astype(np.float64)
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        value = value / normalizer
+
+        roots.append(offset)
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(np.where(is_leaf, -1, tree.children_left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, -1, tree.children_right + offset).astype(np.int32))
+        missing_left = getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8))
+        missing_lefts.append(np.asarray(missing_left, dtype=bool))
+        values.append(value)
+        weights.append(tree.weighted_n_node_samples.astype(np.float64))
+        offset += tree.node_count
+
+    arrays = {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "missing_left": np.concatenate(missing_lefts),
+        "value": np.concatenate(values),
+        "weight": np.concatenate(weights),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }
+    arrays["children"] = child_table(arrays["left"], arrays["right"])
+
+    os.makedirs(directory, exist_ok=True)
+    for name in ARRAYS:
+        np.save(os.path.join(directory, f"{name}.npy"), arrays[name])
+
+    return write_manifest(
+        directory,
+        "compiled_forest",
+        [f"{name}.npy" for name in ARRAYS],
+        feature_names=[str(f) for f in getattr(model, "feature_names_in_", [])],
+        classes=[c.item() if hasattr(c, "item") else c for c in model.classes_],
+        n_trees=len(model.estimators_),
+        n_nodes=int(offset),
+        max_depth=int(max(e.tree_.max_depth for e in model.estimators_)),
+        libraries=library_versions("scikit-learn", "numpy"),
+    )
+
+
+def child_table(left, right):
+    """Interleaved (left, right) child of every node, intp; a leaf points to itself.
+
+    Lets ``apply`` take ``max_depth`` steps without branching:
+    ``node = children[2 * node + go_right]``.
+    """
+    is_leaf = left == -1
+    nodes = np.arange(len(left))
+    return np.stack([
+        np.where(is_leaf, nodes, left),
+        np.where(is_leaf, nodes, right),
+    ], axis=1).ravel().astype(np.intp)
+
+
+class CompiledForest:
+    """Vectorized evaluator over flat forest node arrays"""
+
+    def __init__(self, arrays, manifest):
+        # np.asarray 는 memmap 을 복사하지 않고 일반 ndarray 뷰로 바꿔 인덱싱 오버헤드를 줄임
+        self.feature = np.asarray(arrays["feature"])
+        self.threshold = np.asarray(arrays["threshold"])
+        self.left = np.asarray(arrays["left"])
+        self.right = np.asarray(arrays["right"])
+        self.missing_left = np.asarray(arrays["missing_left"])
+        self.value = np.asarray(arrays["value"])
+        self.weight = np.asarray(arrays["weight"])
+        self.roots = np.asarray(arrays["roots"], dtype=np.intp)
+        # 탐색용 child 표도 내보낼 때 만들어 두어 워커 프로세스 간에 같은 memmap 을 공유
+        self.children = np.asarray(arrays["children"])
+        self.feature_names = manifest["feature_names"]
+        self.classes_ = np.asarray(manifest["classes"])
+        self.n_trees = manifest["n_trees"]
+        self.max_depth = manifest["max_depth"]
+        # 빠른 설명 (path attribution) 의 정확한 SHAP 대비 오차 (내보낼 때 측정)
+        self.fast_explanation_error = manifest.get("fast_explanation_error")
+
+    @classmethod
+    def load(cls, directory, mmap=True, verify=True):
+        """Load the arrays, memory-mapped read-only by default"""
+        return cls.from_manifest(directory, read_manifest(directory, verify=verify), mmap=mmap)
+
+    @classmethod
+    def from_manifest(cls, directory, manifest, mmap=True):
+        mode = "r" if mmap else None
+        # allow_pickle=False: object 배열이 섞여 있으면 로드하지 않고 실패
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode, allow_pickle=False) for name in ARRAYS}
+        return cls(arrays, manifest)
+
+    def apply(self, X):
+        """Return the leaf node index reached in every tree, shape (n_samples, n_trees)"""
+        if hasattr(X, "columns") and self.feature_names:
+            X = X[self.feature_names]
+        # sklearn 은 입력을 float32 로 변환한 뒤 float64 threshold 와 비교
+        # (float32 → float64 변환은 정확하므로 미리 바꿔 두면 단계마다 형 변환이 없음)
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_samples, n_features = X.shape
+        flat = X.astype(np.float64).ravel()
+        has_missing = np.isnan(flat).any()
+        row_offset = (np.arange(n_samples) * n_features)[:, np.newaxis]
+        node = np.broadcast_to(self.roots, (n_samples, self.n_trees)).copy()
+
+        for _ in range(self.max_depth):
+            x = flat[row_offset + self.feature[node]]
+            # x <= threshold 이면 왼쪽, 결측값은 missing_left 에 따라 이동
+            go_right = x > self.threshold[node]
+            if has_missing:
+                go_right |= np.isnan(x) & ~self.missing_left[node]
+            node = self.children[2 * node + go_right]
+        return node
+
+    def predict_proba(self, X):
+        if hasattr(X, "columns") and self.feature_names:
+            X = X[self.feature_names]
+        X = np.asarray(X, dtype=np.float32)
+        proba = np.empty((len(X), self.value.shape[1]))
+        # 작업 배열이 캐시에 머물도록 행을 나누어 처리
+        for start in range(0, len(X), CHUNK_ROWS):
+            leaves = self.apply(X[start:start + CHUNK_ROWS])
+            # 트리 순서대로 누적해야 sklearn 결과와 비트 단위로 일치: (트리, 행, 클래스) 의
+            # 첫 축을 줄이면 NumPy 는 pairwise 합산 없이 트리 순서대로 더함
+            proba[start:start + len(leaves)] = self.value[leaves.T].sum(axis=0)
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def contributions(self, X):
+        """Saabas path attribution: (bias, per-feature contributions of shape (n_samples, n_features, n_classes)).
+
+        Along each decision path the change in class probability from a
+        node to the child taken is credited to the node's split feature.
+        ``bias + contributions.sum(axis=1)`` equals ``predict_proba(X)``.
+        """
+        if hasattr(X, "columns") and self.feature_names:
+            X = X[self.feature_names]
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_samples, n_features = X.shape
+        n_classes = self.value.shape[1]
+        contributions = np.zeros((n_samples, n_features, n_classes))
+
+        for start in range(0, n_samples, CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS]
+            n_rows = len(chunk)
+            flat = chunk.ravel()
+            row_offset = (np.arange(n_rows) * n_features)[:, np.newaxis]
+            node = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+            totals = np.zeros((n_classes, n_rows * n_features))
+
+            for _ in range(self.max_depth):
+                feature = self.feature[node]
+                x = flat[row_offset + feature]
+                go_left = (x <= self.threshold[node]) | (np.isnan(x) & self.missing_left[node])
+                child = self.children[2 * node + ~go_left]
+                # leaf 는 자기 자신을 가리키므로 변화량이 0
+                delta = self.value[child] - self.value[node]
+                index = (row_offset + feature).ravel()
+                for c in range(n_classes):
+                    totals[c] += np.bincount(index, weights=delta[..., c].ravel(), minlength=n_rows * n_features)
+                node = child
+
+            contributions[start:start + n_rows] = totals.T.reshape(n_rows, n_features, n_classes)
+
+        bias = self.value[self.roots].mean(axis=0)
+        return bias, contributions / self.n_trees
+
+
+class PathAttributionExplainer:
+    """Fast approximate explainer: Saabas path attribution in the layout of the exact SHAP explainer.
+
+    Returns a shap.Explanation with per-class values like
+    ``shap.TreeExplainer`` on a RandomForestClassifier. The values sum to
+    the prediction minus the expected value, but they are not Shapley
+    values (features split near the root get more credit); the error
+    against exact SHAP is ``forest.fast_explanation_error``.
+    """
+
+    def __init__(self, forest):
+        self.forest = forest
+
+    def __call__(self, X):
+        import shap
+
+        if hasattr(X, "columns") and self.forest.feature_names:
+            X = X[self.forest.feature_names]
+        bias, values = self.forest.contributions(X)
+        return shap.Explanation(
+            values=values,
+            base_values=np.tile(bias, (len(values), 1)),
+            data=np.asarray(X),
+            feature_names=list(X.columns) if hasattr(X, "columns") else None,
+        )
+
+
+def check_parity(model, forest, X):
+    """Return True if ``forest`` reproduces ``model.predict_proba`` exactly on ``X``"""
+    n_jobs = model.n_jobs
+    model.n_jobs = 1  # 병렬 누적은 합산 순서가 달라질 수 있음
+    try:
+        expected = model.predict_proba(X)
+    finally:
+        model.n_jobs = n_jobs
+    return np.array_equal(expected, forest.predict_proba(X))
+
+
+def parity_sample(forest, n_samples, seed=0):
+    """Random rows around the split thresholds of ``forest`` (exercises both branches)"""
+    # 학습 범위를 모르므로 각 split threshold 주변 값으로 무작위 표본을 만들어 검증
+    rng = np.random.default_rng(seed)
+    n_features = int(forest.feature.max()) + 1 if not forest.feature_names else len(forest.feature_names)
+    X = np.empty((n_samples, n_features))
+    for j in range(n_features):
+        thresholds = forest.threshold[(forest.left != -1) & (forest.feature == j)]
+        X[:, j] = rng.choice(thresholds, n_samples) + rng.normal(0, 1e-3, n_samples) if len(thresholds) else 0.0
+    if forest.feature_names:
+        X = pd.DataFrame(X, columns=forest.feature_names)
+    return X
@@ -0,0 +1,238 @@
+import json
+import math
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import shap
+from catboost import Pool
+
+
+class CatBoostShapExplainer:
+    """Exact TreeSHAP explainer backed by CatBoost's native ShapValues.
+
+    Returns the same shap.Explanation layout (log-odds values, base value,
+    data, feature names) as ``shap.TreeExplainer(model)(X)`` without the
+    cost of unpickling a generic shap explainer.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.cat_features = list(model.get_cat_feature_indices())
+
+    def __call__(self, X):
+        X = X[self.model.feature_names_]
+        pool = Pool(X, cat_features=self.cat_features)
+        raw = self.model.get_feature_importance(pool, type="ShapValues")
+        return shap.Explanation(
+            values=raw[:, :-1],
+            base_values=raw[:, -1],
+            data=X.to_numpy(),
+            feature_names=list(X.columns),
+        )
+
+
+class ObliviousTreeShapExplainer:
+    """Exact path-dependent TreeSHAP for CatBoost oblivious trees via lookup tables.
+
+    An oblivious tree of depth d routes every sample by d binary splits, so
+    its SHAP values depend only on the d split outcomes. For each tree the
+    Shapley values of all 2**d outcome patterns are precomputed once; a call
+    then only evaluates the splits and sums the matching table rows. Values
+    match ``get_feature_importance(type='ShapValues')`` to float precision.
+
+    Raises ValueError for models this representation does not cover
+    (non-symmetric trees, CTR splits, categorical values other than 0/1).
+    """
+
+    def __init__(self, model, tables=None):
+        self.model = model
+        self.feature_names = list(model.feature_names_)
+        if tables is None:
+            tables = self.build_tables(model)
+
+        # 아티팩트에서 읽은 테이블은 memory-map 배열 그대로 사용
+        self.split_feature = tables["split_feature"]
+        self.split_border = tables["split_border"]
+        self.split_invert = tables["split_invert"]
+        self._phi = tables["phi"]
+        self.depth = self.split_feature.shape[1]
+        self.expected_value = float(tables["expected_value"])
+
+        # (tree, slot) -> 변수 매핑 행렬; 마지막 열은 dummy slot
+        slot_feature = np.asarray(tables["slot_feature"]).ravel()
+        self._slot_to_feature = np.zeros((len(slot_feature), len(self.feature_names) + 1))
+        self._slot_to_feature[np.arange(len(slot_feature)), slot_feature] = 1.0
+
+    @classmethod
+    def build_tables(cls, model):
+        """Split arrays, per-tree Shapley tables and expected value of ``model``.
+
+        Costs about a second and ~190 MB of temporary memory, so packaged
+        models store the result (see ``utils.artifacts.export_catboost``).
+        """
+        feature_names = list(model.feature_names_)
+        n_features = len(feature_names)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.json")
+            model.save_model(path, format="json")
+            with open(path) as f:
+                dump = json.load(f)
+
+        trees = dump.get("oblivious_trees")
+        if not trees:
+            raise ValueError("Only symmetric (oblivious) CatBoost trees are supported")
+        depth = len(trees[0]["splits"])
+        if any(len(t["splits"]) != depth for t in trees):
+            raise ValueError("All trees must have the same depth")
+        if any(len(t["leaf_values"]) != 2 ** depth for t in trees):
+            raise ValueError("Only single-output models are supported")
+
+        features_info = dump["features_info"]
+        float_index = {f["feature_index"]: f["flat_feature_index"] for f in features_info.get("float_features", [])}
+        cat_index = {f["feature_index"]: f["flat_feature_index"] for f in features_info.get("categorical_features", [])}
+        one_hot_bits = cls._one_hot_bits(model, trees, n_features)
+
+        n_trees = len(trees)
+        n_leaves = 2 ** depth
+        split_feature = np.zeros((n_trees, depth), dtype=np.int64)
+        split_border = np.zeros((n_trees, depth), dtype=np.float32)
+        split_invert = np.zeros((n_trees, depth), dtype=bool)
+        leaf_values = np.zeros((n_trees, n_leaves))
+        leaf_weights = np.zeros((n_trees, n_leaves))
+
+        scale, bias = dump["scale_and_bias"]
+        bias = bias[0] if isinstance(bias, list) else bias
+
+        for t, tree in enumerate(trees):
+            for s, split in enumerate(tree["splits"]):
+                if split["split_type"] == "FloatFeature":
+                    split_feature[t, s] = float_index[split["float_feature_index"]]
+                    split_border[t, s] = split["border"]
+                elif split["split_type"] == "OneHotFeature":
+                    # 이진 범주형 변수: (x == 1) 또는 (x == 0) 을 x > 0.5 로 표현
+                    split_feature[t, s] = cat_index[split["cat_feature_index"]]
+                    split_border[t, s] = 0.5
+                    split_invert[t, s] = not one_hot_bits[(t, s)]
+                else:
+                    raise ValueError(f"Unsupported split type: {split['split_type']}")
+            leaf_values[t] = np.asarray(tree["leaf_values"]) * scale
+            leaf_weights[t] = tree["leaf_weights"]
+
+        phi, slot_feature, empty_set_value = cls._shapley_tables(split_feature, leaf_values, leaf_weights, n_features)
+        return {
+            "split_feature": split_feature,
+            "split_border": split_border,
+            "split_invert": split_invert,
+            "slot_feature": slot_feature,
+            "phi": phi,
+            "expected_value": float(empty_set_value + bias),
+        }
+
+    @staticmethod
+    def _one_hot_bits(model, trees, n_features):
+        """Map each one-hot split to True if it fires for category 1, False for category 0"""
+        cat_features = list(model.get_cat_feature_indices())
+        if not cat_features:
+            return {}
+        probes = pd.DataFrame(np.zeros((2, n_features)), columns=model.feature_names_)
+        for j in cat_features:
+            probes.iloc[:, j] = [0, 1]
+        probes = probes.astype({probes.columns[j]: "int64" for j in cat_features})
+        leaves = model.calc_leaf_indexes(Pool(probes, cat_features=cat_features))
+
+        bits = {}
+        for t, tree in enumerate(trees):
+            for s, split in enumerate(tree["splits"]):
+                if split["split_type"] != "OneHotFeature":
+                    continue
+                fires_for_zero = bool((leaves[0, t] >> s) & 1)
+                fires_for_one = bool((leaves[1, t] >> s) & 1)
+                if fires_for_zero == fires_for_one:
+                    raise ValueError("Only categorical features coded 0/1 are supported")
+                bits[(t, s)] = fires_for_one
+        return bits
+
+    @staticmethod
+    def _shapley_tables(split_feature, leaf_values, leaf_weights, n_features):
+        """(phi, slot_feature, empty-set value); phi[t, leaf, slot] is the Shapley value of a slot"""
+        n_trees, n_leaves = leaf_values.shape
+        depth = split_feature.shape[1]
+        n_subsets = 2 ** depth
+
+        # 트리마다 등장하는 변수를 slot 0..depth-1 에 배치 (남는 slot 은 기여도 0 인 dummy)
+        slot_feature = np.full((n_trees, depth), n_features)
+        split_slot = np.zeros((n_trees, depth), dtype=np.int64)
+        for t in range(n_trees):
+            unique = list(dict.fromkeys(split_feature[t].tolist()))
+            slot_feature[t, :len(unique)] = unique
+            split_slot[t] = [unique.index(f) for f in split_feature[t]]
+
+        subsets = np.arange(n_subsets)
+        # in_subset[t, S, j]: split j 의 변수가 부분집합 S 에 포함되는지
+        in_subset = ((subsets[None, :, None] >> split_slot[:, None, :]) & 1).astype(bool)
+
+        # ratio[t, j, l]: 레벨 j 에서 leaf l 쪽 자식으로 갈 (학습 데이터 기준) 비율
+        ratio = np.empty((n_trees, depth, n_leaves))
+        group_weight = leaf_weights
+        for j in range(depth):
+            groups = group_weight.reshape(n_trees, n_leaves >> (j + 1), 2, 1 << j)
+            parent = groups.sum(axis=2, keepdims=True)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                ratio[:, j] = np.where(parent > 0, groups / parent, 0.0).reshape(n_trees, n_leaves)
+            group_weight = np.broadcast_to(parent, groups.shape).reshape(n_trees, n_leaves)
+
+        # expectation[t, S, b]: S 의 변수만 알려졌을 때의 기대값, b 는 split 결과 패턴
+        expectation = np.broadcast_to(leaf_values[:, None, :], (n_trees, n_subsets, n_leaves)).copy()
+        for j in range(depth):
+            expectation *= np.where(in_subset[:, :, j, None], 1.0, ratio[:, None, j, :])
+        for j in range(depth):
+            groups = expectation.reshape(n_trees, n_subsets, n_leaves >> (j + 1), 2, 1 << j)
+            summed = np.broadcast_to(groups.sum(axis=3, keepdims=True), groups.shape)
+            expectation = np.where(in_subset[:, :, j, None, None, None], groups, summed)
+            expectation = expectation.reshape(n_trees, n_subsets, n_leaves)
+
+        # Shapley 가중치로 slot 별 기여도 계산
+        sizes = np.array([bin(s).count("1") for s in subsets])
+        weights = np.array([
+            math.factorial(k) * math.factorial(depth - k - 1) / math.factorial(depth)
+            for k in range(depth)
+        ])
+        phi = np.zeros((n_trees, n_leaves, depth))
+        for i in range(depth):
+            without = subsets[(subsets >> i) & 1 == 0]
+            delta = expectation[:, without | (1 << i), :] - expectation[:, without, :]
+            phi[:, :, i] = (delta * weights[sizes[without]][None, :, None]).sum(axis=1)
+
+        return phi, slot_feature, expectation[:, 0, 0].sum()
+
+    def shap_values(self, X):
+        """Return an (n_samples, n_features) array of SHAP values in log-odds"""
+        values = np.asarray(X, dtype=np.float32)
+        fired = (values[:, self.split_feature] > self.split_border) ^ self.split_invert
+        leaf = (fired.astype(np.int64) << np.arange(self.depth)).sum(axis=-1)
+        contrib = self._phi[np.arange(leaf.shape[1]), leaf]
+        return (contrib.reshape(len(values), -1) @ self._slot_to_feature)[:, :-1]
+
+    def __call__(self, X):
+        X = X[self.feature_names]
+        return shap.Explanation(
+            values=self.shap_values(X),
+            base_values=np.full(len(X), self.expected_value),
+            data=X.to_numpy(),
+            feature_names=list(X.columns),
+        )
+
+
+def catboost_explainer(model):
+    """Return the fastest exact SHAP explainer available for a CatBoost model.
+
+    Uses the lookup tables stored with a packaged model (``shap_tables``,
+    see ``utils.artifacts``) when present instead of building them.
+    """
+    try:
+        return ObliviousTreeShapExplainer(model, getattr(model, "shap_tables", None))
+    except ValueError:
+        return CatBoostShapExplainer(model)
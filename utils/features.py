@@ -0,0 +1,168 @@
+"""Declarative schema of the model input features.
+
+Every feature is described once (label, unit, plausible range, widget
+format, categorical choices). The prediction pages build their forms from
+it, batch scoring and the HTTP API reorder columns with it, and
+``validate`` checks whole batches with vectorized NumPy range checks.
+
+Ranges are hard plausibility limits that catch unit mix-ups and typing
+errors; they are wider than the values seen in training.
+"""
+import numpy as np
+import pandas as pd
+
+
+class Feature:
+    def __init__(self, name, label, unit=None, low=None, high=None, fmt="%.2f", choices=None):
+        self.name = name
+        self.label = label
+        self.unit = unit
+        self.low = low
+        self.high = high
+        self.fmt = fmt
+        self.choices = choices  # 범주형 변수: {코드: 표시 이름}
+
+    @property
+    def display_name(self):
+        return f"{self.label} ({self.unit})" if self.unit else self.label
+
+    @property
+    def range_text(self):
+        if self.choices:
+            return ", ".join(f"{code}({text})" for code, text in self.choices.items())
+        return f"{self.low:g} ~ {self.high:g}"
+
+
+FEATURES = {f.name: f for f in [
+    # 심초음파 (Dallaire / Dahdah Z-score)
+    Feature("initial_echo_LAD_Z", "Left Anterior Descending Z-score", low=-10, high=30),
+    Feature("initial_echo_LMCA_Z", "Left Main Coronary Artery Z-score", low=-10, high=30),
+    Feature("initial_echo_RCA_Z", "Right Coronary Artery Z-score", low=-10, high=30),
+    Feature("initial_echo_LCx_Z", "Left Circumflex Z-score", low=-10, high=30),
+    # 임상 정보
+    Feature("fever_duration", "Fever Duration", "days", 0, 60, fmt="%.1f"),
+    Feature("Sex", "Sex", choices={0: "Female", 1: "Male"}),
+    # 검사실 소견 (1차 IVIG 투여 전 3일 이내)
+    Feature("CRP_before", "C-Reactive Protein", "mg/dL", 0, 50),
+    Feature("ESR_before", "ESR", "mm/hr", 0, 200),
+    Feature("P_before", "Phosphorus", "mg/dL", 0.5, 15),
+    Feature("TB_before", "Total Bilirubin", "mg/dL", 0, 30),
+    Feature("ALT_before", "Alanine Aminotransferase", "IU/L", 0, 5000),
+    Feature("AST_before", "Aspartate Aminotransferase", "IU/L", 0, 5000),
+    Feature("HCT_before", "Hematocrit", "%", 10, 70),
+    Feature("Hb_before", "Hemoglobin", "g/dL", 3, 25),
+    Feature("Alb_before", "Albumin", "g/dL", 1, 6),
+    Feature("Protein_before", "Protein", "g/dL", 2, 12),
+    Feature("Lympho_before", "Lymphocyte", "%", 0, 100),
+    Feature("Seg_before", "Neutrophil", "%", 0, 100),
+    Feature("PLT_before", "Platelet Count", "10³/μL", 10, 2000),
+    Feature("Chol_before", "Total Cholesterol", "mg/dL", 30, 500),
+    # 학습 데이터의 ANC 는 /μL 단위 (예: 9,300)
+    Feature("ANC_before", "Absolute Neutrophil Count", "/μL", 0, 60000),
+    Feature("Ca_before", "Calcium", "mg/dL", 4, 15),
+    Feature("PCT_before", "Plateletcrit", "%", 0, 2),
+    Feature("CO2_before", "Carbon Dioxide", "mEq/L", 5, 45),
+]}
+
+# 모델 입력 변수 순서 (학습 시 컬럼 순서와 동일해야 함)
+CAA_FEATURE_ORDER = [
+    "initial_echo_LAD_Z", "initial_echo_LMCA_Z", "initial_echo_RCA_Z", "initial_echo_LCx_Z",
+    "fever_duration", "Sex", "AST_before", "ALT_before", "CRP_before", "ESR_before", "HCT_before", "Hb_before",
+    "P_before", "TB_before", "Alb_before", "Protein_before"
+]
+
+IVIG_FEATURE_ORDER = [
+    "PLT_before", "Lympho_before", "Seg_before", "Chol_before", "CRP_before", "P_before",
+    "TB_before", "Ca_before", "AST_before", "PCT_before", "initial_echo_LAD_Z",
+    "ANC_before", "CO2_before"
+]
+
+FEATURE_ORDERS = {
+    "caa": CAA_FEATURE_ORDER,
+    "ivig": IVIG_FEATURE_ORDER,
+}
+
+# 두 모델을 함께 평가할 때 한 번만 입력하는 변수 (CAA 순서 뒤에 IVIG 전용 변수)
+COMBINED_FEATURE_ORDER = list(dict.fromkeys(CAA_FEATURE_ORDER + IVIG_FEATURE_ORDER))
+SHARED_FEATURES = [name for name in CAA_FEATURE_ORDER if name in IVIG_FEATURE_ORDER]
+
+# 입력 화면의 그룹별 표시 순서
+FORM_LAYOUTS = {
+    "caa": {
+        "lab": ["CRP_before", "ESR_before", "P_before", "TB_before", "ALT_before", "AST_before",
+                "HCT_before", "Hb_before", "Alb_before", "Protein_before"],
+        "echo": ["initial_echo_RCA_Z", "initial_echo_LMCA_Z", "initial_echo_LAD_Z", "initial_echo_LCx_Z"],
+        "clinical": ["fever_duration", "Sex"],
+    },
+    "ivig": {
+        "lab": ["Lympho_before", "Seg_before", "PLT_before", "Chol_before", "CRP_before", "TB_before",
+                "P_before", "ANC_before", "Ca_before", "AST_before", "PCT_before", "CO2_before"],
+        "echo": ["initial_echo_LAD_Z"],
+    },
+}
+FORM_LAYOUTS["combined"] = {
+    group: list(dict.fromkeys(FORM_LAYOUTS["caa"].get(group, []) + FORM_LAYOUTS["ivig"].get(group, [])))
+    for group in FORM_LAYOUTS["caa"]
+}
+
+# 범주형 변수와 허용 값 (CatBoost 는 정수형으로 전달해야 함)
+CATEGORICAL_FEATURES = {
+    name: tuple(f.choices) for name, f in FEATURES.items() if f.choices
+}
+
+
+def display_names(feature_names):
+    """Human-readable labels (with units) for a list of feature names"""
+    return [FEATURES[n].display_name if n in FEATURES else n for n in feature_names]
+
+
+def _bounds(feature_order):
+    low = np.array([-np.inf if FEATURES[n].low is None else FEATURES[n].low for n in feature_order], dtype=float)
+    high = np.array([np.inf if FEATURES[n].high is None else FEATURES[n].high for n in feature_order], dtype=float)
+    return low, high
+
+
+def validate(X, feature_order):
+    """Vectorized checks over a numeric feature frame in ``feature_order``.
+
+    Returns two boolean arrays of shape (n_rows, n_features): ``missing``
+    (NaN) and ``out_of_range`` (outside the schema range or not an allowed
+    categorical code).
+    """
+    values = np.asarray(X, dtype=float)
+    missing = np.isnan(values)
+    low, high = _bounds(feature_order)
+    # NaN 비교는 False 이므로 결측값은 out_of_range 에 포함되지 않음
+    out_of_range = (values < low) | (values > high)
+    for j, name in enumerate(feature_order):
+        choices = FEATURES[name].choices
+        if choices:
+            out_of_range[:, j] = ~missing[:, j] & ~np.isin(values[:, j], list(choices))
+    return missing, out_of_range
+
+
+def error_messages(missing, out_of_range, feature_order):
+    """Per-row error message (empty string for valid rows) from ``validate`` output"""
+    messages = np.full(len(missing), "", dtype=object)
+    columns = np.asarray(feature_order)
+    bad_rows = np.flatnonzero(missing.any(axis=1) | out_of_range.any(axis=1))
+    for i in bad_rows:
+        parts = []
+        if missing[i].any():
+            parts.append("Missing or invalid: " + ", ".join(columns[missing[i]]))
+        if out_of_range[i].any():
+            parts.append("Out of range: " + ", ".join(
+                f"{n} ({FEATURES[n].range_text})" for n in columns[out_of_range[i]]
+            ))
+        messages[i] = "; ".join(parts)
+    return messages
+
+
+def to_model_frame(records, feature_order):
+    """Build a numeric feature frame in ``feature_order`` from a list of dicts"""
+    return pd.DataFrame(records, columns=feature_order).apply(pd.to_numeric, errors="coerce")
+
+
+def cast_categoricals(X):
+    """Cast categorical columns of a validated frame to int64 (CatBoost rejects float categories)"""
+    return X.astype({c: "int64" for c in CATEGORICAL_FEATURES if c in X.columns})
@@ -0,0 +1,367 @@
+"""Local job queue that runs heavy prediction work in a process pool.
+
+SHAP explanations and cohort scoring are CPU-bound and hold the GIL, so
+running them in the Streamlit script thread stalls every other session.
+``JobQueue`` runs them in worker processes instead; each worker loads the
+models once at start-up (``_init_worker``) and keeps them for its lifetime.
+
+A job is a task function plus a list of chunks; the UI polls
+``job.progress`` (finished chunks / chunks). Scheduling is fair between
+owners (Streamlit sessions): at most ``workers`` chunks are in flight and
+the next free worker takes a chunk from the owner that waited longest, so
+one large cohort cannot starve single-patient requests. Each owner may
+have ``max_jobs_per_owner`` unfinished jobs. Cancelling drops the chunks
+that have not started.
+
+Every worker holds its own copy of the models and explainers, about
+340 MB, so the default is a single worker. ``workers=0``
+(``KD_JOB_WORKERS=0``) is the low-memory opt-out: chunks run one at a
+time on a background thread against the caller's registry, with the same
+scheduling, progress and cancellation, but heavy chunks then compete with
+the Streamlit sessions for the GIL.
+"""
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from utils.metrics import metrics
+from utils.model_registry import ModelRegistry
+
+
+# 워커 1개가 모델과 explainer 를 모두 로드하면 약 340MB 이므로 기본값은 1
+# 메모리가 부족한 환경 (예: 512MB) 에서는 KD_JOB_WORKERS=0 으로 프로세스 없이 백그라운드 스레드에서 실행
+DEFAULT_WORKERS = int(os.environ.get("KD_JOB_WORKERS", 1))
+DEFAULT_MAX_JOBS_PER_OWNER = int(os.environ.get("KD_MAX_JOBS_PER_SESSION", 2))
+# 워커 시작 시 미리 로드할 모델과 explainer
+DEFAULT_PRELOAD = ("caa_model", "caa_explainer", "ivig_model", "ivig_explainer")
+# 완료된 작업은 결과를 가져갈 수 있도록 일정 시간 보관
+FINISHED_TTL_SECONDS = 3600
+MAX_FINISHED = 200
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class QueueFull(RuntimeError):
+    """Raised when an owner already has the maximum number of unfinished jobs"""
+
+
+# 워커 프로세스 전역 상태: 프로세스마다 하나의 레지스트리
+_worker_registry = None
+
+
+def _init_worker(preload):
+    import warmup
+
+    global _worker_registry
+    _worker_registry = ModelRegistry()
+    for name in preload:
+        try:
+            _worker_registry.get(name)
+        except Exception:
+            # 로드 실패는 해당 모델을 쓰는 작업에서 오류로 보고
+            pass
+    # 아직 작업을 받기 전이므로 로드한 모델만 GC 검사 대상에서 제외됨
+    warmup.freeze()
+
+
+def _run_chunk_with(registry, task, chunk):
+    start = time.perf_counter()
+    result = task(registry, chunk)
+    return result, time.perf_counter() - start
+
+
+def run_in_worker(task, chunk):
+    """Run ``task(registry, chunk)`` in a ``worker_pool`` process; returns (result, seconds)"""
+    return _run_chunk_with(_worker_registry, task, chunk)
+
+
+def _noop(registry, chunk):
+    return None
+
+
+def worker_pool(workers, preload=DEFAULT_PRELOAD):
+    """ProcessPoolExecutor whose workers load ``preload`` once into a per-process registry"""
+    # fork 는 Streamlit 의 스레드 상태를 복제하므로 깨끗한 프로세스에서 시작
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(tuple(preload),),
+    )
+
+
+class Job:
+    """State, progress and timing of one submitted job"""
+
+    def __init__(self, job_id, owner, kind, label, n_chunks):
+        self.id = job_id
+        self.owner = owner
+        self.kind = kind
+        self.label = label
+        self.status = QUEUED
+        self.total = n_chunks
+        self.completed = 0
+        self.results = [None] * n_chunks
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.worker_seconds = 0.0
+        self.pending = deque()
+        self.in_flight = 0
+
+    @property
+    def done(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def progress(self):
+        return self.completed / self.total if self.total else 1.0
+
+    @property
+    def wait_seconds(self):
+        """Time from submission until the first chunk started"""
+        end = self.started_at if self.started_at is not None else (self.finished_at or time.time())
+        return end - self.submitted_at
+
+    @property
+    def run_seconds(self):
+        """Time from the first chunk starting until the job finished (so far)"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def to_row(self):
+        return {
+            "id": self.id,
+            "owner": self.owner[:8],
+            "kind": self.kind,
+            "label": self.label,
+            "status": self.status,
+            "progress": self.progress,
+            "wait_s": self.wait_seconds,
+            "run_s": self.run_seconds,
+            "worker_s": self.worker_seconds,
+            "error": self.error or "",
+        }
+
+
+class JobQueue:
+    """Fair, bounded job queue over a process pool whose workers preload the models"""
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_jobs_per_owner=DEFAULT_MAX_JOBS_PER_OWNER,
+                 preload=DEFAULT_PRELOAD, registry=None):
+        self.workers = workers
+        self.max_jobs_per_owner = max_jobs_per_owner
+        self.preload = tuple(preload)
+        self._registry = registry  # workers=0 일 때 사용할 레지스트리
+        self._pool = None
+        self._run_chunk = None
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._jobs = OrderedDict()
+        self._owners = OrderedDict()  # 실행 대기 중인 청크가 있는 owner -> 작업 deque (라운드 로빈)
+        self._in_flight = 0
+
+    @property
+    def slots(self):
+        """Chunks that can run at the same time (the background thread counts as one)"""
+        return max(self.workers, 1)
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.workers > 0:
+                self._pool = worker_pool(self.workers, self.preload)
+                self._run_chunk = run_in_worker
+            else:
+                # 워커 프로세스 없이 백그라운드 스레드 1개에서 이 프로세스의 레지스트리로 실행
+                if self._registry is None:
+                    self._registry = ModelRegistry()
+                self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jobs")
+                self._run_chunk = partial(_run_chunk_with, self._registry)
+        return self._pool
+
+    def start(self):
+        """Start the workers now (and load their models) instead of on the first job"""
+        if self.workers > 0:
+            with self._lock:
+                pool = self._get_pool()
+            for future in [pool.submit(run_in_worker, _noop, None) for _ in range(self.workers)]:
+                future.result()
+
+    def submit(self, owner, kind, task, chunks, label=""):
+        """Queue ``task(registry, chunk)`` for every chunk; returns the Job.
+
+        ``task`` must be a module-level function so it can be sent to the
+        workers. Raises QueueFull if ``owner`` has too many unfinished jobs.
+        """
+        chunks = list(chunks)
+        with self._lock:
+            self._prune()
+            active = sum(1 for job in self._jobs.values() if job.owner == owner and not job.done)
+            if active >= self.max_jobs_per_owner:
+                raise QueueFull(f"{active} jobs are still running for this session")
+
+            job = Job(str(next(self._ids)), owner, kind, label, len(chunks))
+            self._jobs[job.id] = job
+            if not chunks:
+                self._finish(job, DONE)
+                return job
+            job.pending.extend((i, task, chunk) for i, chunk in enumerate(chunks))
+            self._owners.setdefault(owner, deque()).append(job)
+            self._dispatch()
+            return job
+
+    def _dispatch(self):
+        # 호출자가 lock 을 잡고 있음
+        while self._in_flight < self.slots and self._owners:
+            owner, jobs = next(iter(self._owners.items()))
+            job = jobs[0]
+            index, task, chunk = job.pending.popleft()
+            if not job.pending:
+                jobs.popleft()
+            # 다음 청크는 다른 owner 부터 (가장 오래 기다린 owner 가 앞)
+            del self._owners[owner]
+            if jobs:
+                self._owners[owner] = jobs
+
+            if job.started_at is None:
+                job.started_at = time.time()
+                job.status = RUNNING
+            job.in_flight += 1
+            self._in_flight += 1
+            try:
+                future = self._get_pool().submit(self._run_chunk, task, chunk)
+            except Exception as e:
+                # 워커가 비정상 종료된 pool: 다음 제출 때 새로 만듦
+                self._pool = None
+                job.in_flight -= 1
+                self._in_flight -= 1
+                job.error = f"Worker pool unavailable: {e}"
+                self._finish(job, FAILED)
+                continue
+            future.add_done_callback(partial(self._chunk_done, job, index))
+
+    def _chunk_done(self, job, index, future):
+        with self._lock:
+            job.in_flight -= 1
+            self._in_flight -= 1
+            if not job.done:
+                try:
+                    result, seconds = future.result()
+                except Exception as e:
+                    if "BrokenProcessPool" in type(e).__name__:
+                        self._pool = None
+                    job.error = str(e) or type(e).__name__
+                    self._finish(job, FAILED)
+                else:
+                    job.results[index] = result
+                    job.worker_seconds += seconds
+                    job.completed += 1
+                    if job.completed == job.total:
+                        self._finish(job, DONE)
+            self._dispatch()
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+        if job.pending:
+            job.pending.clear()
+            jobs = self._owners.get(job.owner)
+            if jobs is not None and job in jobs:
+                jobs.remove(job)
+                if not jobs:
+                    del self._owners[job.owner]
+        metrics.observe(f"job.{job.kind}.wait", job.wait_seconds)
+        metrics.observe(f"job.{job.kind}.run", job.run_seconds, failed=status == FAILED)
+        metrics.observe(f"job.{job.kind}.worker", job.worker_seconds)
+
+    def cancel(self, job_id):
+        """Cancel a job; chunks already running finish but their results are discarded"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not job.done:
+                self._finish(job, CANCELLED)
+            return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    @property
+    def overloaded(self):
+        """True when a new job would have to wait: every worker (or the background thread) is busy"""
+        with self._lock:
+            queued = sum(len(job.pending) for jobs in self._owners.values() for job in jobs)
+            return self._in_flight + queued >= self.slots
+
+    def _prune(self):
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.done]
+        for i, job in enumerate(finished):
+            if now - job.finished_at > FINISHED_TTL_SECONDS or len(finished) - i > MAX_FINISHED:
+                del self._jobs[job.id]
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+            return {
+                "workers": self.workers,
+                "in_flight": self._in_flight,
+                "queued_chunks": sum(len(job.pending) for job in jobs),
+                "active_jobs": sum(1 for job in jobs if not job.done),
+                "jobs": [job.to_row() for job in reversed(jobs)],
+            }
+
+
+def observe_timings(result):
+    """Record the stage durations measured by a task (in a worker process) in this process's metrics"""
+    for stage, seconds in result.get("timings", {}).items():
+        metrics.observe(stage, seconds)
+
+
+def predict_explain_task(registry, chunk):
+    """Probability and SHAP explanation of one canonical patient row.
+
+    ``result["timings"]`` holds the duration of each stage; the caller
+    records them with ``observe_timings`` in its own process.
+    """
+    from utils.result_cache import explanation_result, probability_result
+
+    model_name, X = chunk
+    model_artifact, explainer_artifact = f"{model_name}_model", f"{model_name}_explainer"
+    start = time.perf_counter()
+    result = {model_artifact: probability_result(registry.get(model_artifact), X)}
+    middle = time.perf_counter()
+    result[explainer_artifact] = explanation_result(registry.get(explainer_artifact), X)
+    # 워커 프로세스의 metrics 는 화면에 보이지 않으므로 단계별 시간을 결과로 돌려줌 (timings 참조)
+    result["timings"] = {
+        f"{model_name}.predict_proba": middle - start,
+        f"{model_name}.explain": time.perf_counter() - middle,
+    }
+    # 결과를 캐시에 넣을 때 워커가 사용한 모델 버전을 키로 사용
+    result["fingerprints"] = {
+        name: registry.fingerprint(name) for name in (model_artifact, explainer_artifact)
+    }
+    return result
+
+
+def score_task(registry, chunk):
+    """Probabilities (and optionally SHAP values) of a validated feature frame"""
+    from utils.batch import explain_rows, predict_in_chunks
+
+    model_name, X, explain = chunk
+    result = {"probability": predict_in_chunks(registry.get(f"{model_name}_model"), X)}
+    if explain:
+        result["shap_values"] = explain_rows(registry.get(f"{model_name}_explainer"), X)
+    return result
+
+
+def combined_task(registry, X):
+    """Probabilities and SHAP explanations of both models for one canonical combined row"""
+    from utils.combined import assess
+
+    return assess(registry, X)
@@ -0,0 +1,237 @@
+"""Per-stage latency, error and memory metrics for the prediction hot path.
+
+Wrap each stage of a request in ``metrics.stage(name)``:
+
+    with metrics.stage("caa.predict_proba"):
+        pred_prob = ...
+
+Every stage keeps a cumulative latency histogram (Prometheus buckets),
+a call count, an error count (the block raised) and the process RSS
+observed when it last finished. ``metrics.request(name)`` additionally
+times the whole request and, when armed with ``profile_next(n)``, runs
+cProfile over the next ``n`` requests.
+
+The numbers are exported in the Prometheus text format by
+``render_prometheus`` (FastAPI ``/metrics``, or the small HTTP server
+started by ``serve`` for the Streamlit process) and shown on the Admin page.
+"""
+import io
+import os
+import resource
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from utils.model_registry import current_rss_bytes
+
+
+METRICS_PORT = os.environ.get("KD_METRICS_PORT")  # Streamlit 프로세스의 /metrics 포트 (설정 시에만)
+# 초 단위 히스토그램 경계 (Prometheus 기본값보다 짧은 구간을 세분화)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PROFILE_HISTORY = 10
+PROFILE_LINES = 30
+
+
+class _Stage:
+    def __init__(self, n_buckets):
+        self.buckets = [0] * (n_buckets + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rss = 0
+
+
+class Metrics:
+    """Thread-safe registry of per-stage timings shared by all sessions"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._profile_remaining = 0
+        self._profile_sort = "cumulative"
+        self.profiles = deque(maxlen=PROFILE_HISTORY)
+
+    def observe(self, name, seconds, failed=False):
+        rss = current_rss_bytes()
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = _Stage(len(self.buckets))
+            index = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+            stage.buckets[index] += 1
+            stage.count += 1
+            stage.errors += failed
+            stage.total += seconds
+            stage.max = max(stage.max, seconds)
+            stage.rss = rss
+
+    @contextmanager
+    def stage(self, name):
+        """Time the block; an exception escaping it counts as an error and is re-raised"""
+        start = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self.observe(name, time.perf_counter() - start, failed)
+
+    def profile_next(self, n, sort="cumulative"):
+        """Profile the next ``n`` requests with cProfile"""
+        with self._lock:
+            self._profile_remaining = n
+            self._profile_sort = sort
+
+    @property
+    def profile_remaining(self):
+        return self._profile_remaining
+
+    def _take_profile_slot(self):
+        with self._lock:
+            if self._profile_remaining <= 0:
+                return False
+            self._profile_remaining -= 1
+            return True
+
+    @contextmanager
+    def request(self, name):
+        """Time a whole request as stage ``<name>.total`` and profile it if armed"""
+        profiler = None
+        if self._take_profile_slot():
+            import cProfile
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # 다른 프로파일러가 이미 동작 중인 스레드 (Python 3.12+)
+                profiler = None
+
+        start = time.perf_counter()
+        try:
+            with self.stage(f"{name}.total"):
+                yield
+        finally:
+            if profiler is not None:
+                import pstats
+
+                profiler.disable()
+                text = io.StringIO()
+                pstats.Stats(profiler, stream=text).sort_stats(self._profile_sort).print_stats(PROFILE_LINES)
+                self.profiles.append({
+                    "name": name,
+                    "started_at": time.time(),
+                    "seconds": time.perf_counter() - start,
+                    "stats": text.getvalue(),
+                })
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self.profiles.clear()
+
+    def stats(self):
+        """Per-stage summary rows; quantiles are interpolated from the histogram"""
+        with self._lock:
+            stages = {name: (list(s.buckets), s.count, s.errors, s.total, s.max, s.rss)
+                      for name, s in sorted(self._stages.items())}
+        rows = []
+        for name, (buckets, count, errors, total, longest, rss) in stages.items():
+            rows.append({
+                "stage": name,
+                "count": count,
+                "errors": errors,
+                "error_rate": errors / count if count else 0.0,
+                "mean_ms": total / count * 1000 if count else None,
+                "p50_ms": _bucket_quantile(self.buckets, buckets, 0.5, longest) * 1000,
+                "p95_ms": _bucket_quantile(self.buckets, buckets, 0.95, longest) * 1000,
+                "p99_ms": _bucket_quantile(self.buckets, buckets, 0.99, longest) * 1000,
+                "max_ms": longest * 1000,
+                "rss_mb": rss / 2**20,
+            })
+        return rows
+
+    def render_prometheus(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            stages = sorted(self._stages.items())
+            lines = [
+                "# HELP kd_stage_duration_seconds Time spent in each prediction stage.",
+                "# TYPE kd_stage_duration_seconds histogram",
+            ]
+            for name, stage in stages:
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), stage.buckets):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'kd_stage_duration_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'kd_stage_duration_seconds_sum{{stage="{name}"}} {stage.total!r}')
+                lines.append(f'kd_stage_duration_seconds_count{{stage="{name}"}} {stage.count}')
+
+            lines += ["# HELP kd_stage_errors_total Stage executions that raised.", "# TYPE kd_stage_errors_total counter"]
+            lines += [f'kd_stage_errors_total{{stage="{name}"}} {stage.errors}' for name, stage in stages]
+            lines += [
+                "# HELP kd_stage_resident_memory_bytes Process RSS when the stage last finished.",
+                "# TYPE kd_stage_resident_memory_bytes gauge",
+            ]
+            lines += [f'kd_stage_resident_memory_bytes{{stage="{name}"}} {stage.rss}' for name, stage in stages]
+
+        rss = current_rss_bytes()
+        # ru_maxrss 는 커널이 늦게 갱신할 수 있으므로 현재 값보다 작지 않게 보정
+        peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024, rss)
+        lines += [
+            "# HELP process_resident_memory_bytes Resident memory size in bytes.",
+            "# TYPE process_resident_memory_bytes gauge",
+            f"process_resident_memory_bytes {rss}",
+            "# HELP kd_process_peak_resident_memory_bytes Peak resident memory size in bytes.",
+            "# TYPE kd_process_peak_resident_memory_bytes gauge",
+            f"kd_process_peak_resident_memory_bytes {peak}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _bucket_quantile(bounds, counts, q, longest):
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = q * total
+    cumulative = 0
+    for i, n in enumerate(counts):
+        if n and cumulative + n >= rank:
+            lower = bounds[i - 1] if i > 0 else 0.0
+            upper = bounds[i] if i < len(bounds) else longest
+            # 구간 안에서 선형 보간, 관측된 최댓값을 넘지 않도록 제한
+            return min(lower + (upper - lower) * (rank - cumulative) / n, longest)
+        cumulative += n
+    return longest
+
+
+def serve(metrics, port, host="0.0.0.0"):
+    """Serve ``GET /metrics`` from a daemon thread; returns the server"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+# 프로세스 전역 인스턴스 (Streamlit 세션과 API 요청이 공유)
+metrics = Metrics()
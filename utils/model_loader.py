@@ -1,29 +1,81 @@
+import os
+
 import streamlit as st
-import joblib
+
+from utils.batching import BatchedModel, registry_batchers
+from utils.features import FEATURE_ORDERS
+from utils.jobs import JobQueue
+from utils.metrics import metrics
+from utils.model_registry import ModelRegistry
+from utils.result_cache import ResultCache
+from utils.shap_store import DEFAULT_STORE_DIR, ShapStore
 
 
 @st.cache_resource
-def load_models():
-    """Load all models and explainers"""
-    models = {}
-    explainers = {}
-    
-    try:
-        models['caa'] = joblib.load("models/xgb_model.pkl")
-        explainers['caa'] = joblib.load("models/shap_explainer.pkl")
-        st.sidebar.success("CAA model loaded successfully")
-    except Exception as e:
-        st.sidebar.error(f"CAA model loading failed: {str(e)}")
-        models['caa'] = None
-        explainers['caa'] = None
-    
+def get_registry():
+    """Return the model registry shared by all Streamlit sessions"""
+    return ModelRegistry()
+
+
+@st.cache_resource
+def get_result_cache():
+    """Return the prediction/explanation cache shared by all sessions"""
+    cache = ResultCache()
+    # 모델 파일이 바뀌면 이전 버전의 결과를 삭제
+    get_registry().add_listener(cache.invalidate)
+    return cache
+
+
+@st.cache_resource
+def get_shap_store(model_name):
+    """Return the append-only SHAP store of a model, shared by all sessions"""
+    return ShapStore(os.path.join(DEFAULT_STORE_DIR, model_name), FEATURE_ORDERS[model_name])
+
+
+@st.cache_resource
+def get_job_queue():
+    """Return the process-pool job queue shared by all sessions"""
+    # KD_JOB_WORKERS=0 이면 워커 프로세스 없이 백그라운드 스레드에서 실행 (레지스트리 공유)
+    return JobQueue(registry=get_registry())
+
+
+@st.cache_resource
+def get_batchers(model_name):
+    """Return the predict/explain micro-batchers for a model, shared by all sessions"""
+    return registry_batchers(get_registry(), model_name)
+
+
+def load_batched(model_name):
+    """Load a model (and its explainer) and return micro-batched facades for both.
+
+    With job workers SHAP values are computed in the workers, so the
+    explainer is not built here; its facade loads it only if a result is
+    missing from the cache.
+    """
+    names = [f"{model_name}_model"]
+    if get_job_queue().workers == 0:
+        names.append(f"{model_name}_explainer")
+    if load_models(names) is None:
+        return None, None
+    batchers = get_batchers(model_name)
+    return BatchedModel(batchers[f"{model_name}_model"]), batchers[f"{model_name}_explainer"]
+
+
+def load_models(names):
+    """Load the named models and explainers from the shared registry"""
+    registry = get_registry()
+    loaded = {}
+
     try:
-        models['ivig'] = joblib.load("models/rf_model.pkl")
-        explainers['ivig'] = joblib.load("models/shap_explainer_rf.pkl")
-        st.sidebar.success("IVIG model loaded successfully")
+        for name in names:
+            # 이미 로드된 경우에는 레지스트리 조회 시간만 기록됨
+            with metrics.stage(f"load.{name}"):
+                loaded[name] = registry.get(name)
+    except FileNotFoundError as e:
+        st.error(f"❌ 파일을 찾을 수 없습니다: {e}")
+        return None
     except Exception as e:
-        st.sidebar.error(f"IVIG model loading failed: {str(e)}")
-        models['ivig'] = None
-        explainers['ivig'] = None
-    
-    return models, explainers 
\ No newline at end of file
+        st.error(f"❌ 모델 로딩 실패: {str(e)}")
+        return None
+
+    return loaded
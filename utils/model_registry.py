@@ -0,0 +1,199 @@
+import hashlib
+import os
+import resource
+import threading
+import time
+
+
+# 모델 아티팩트 경로 (utils.artifacts 형식의 manifest)
+MODEL_PATHS = {
+    "caa_model": "models/caa_model/manifest.json",
+    "ivig_model": "models/ivig_forest/manifest.json",
+}
+
+
+def _catboost_explainer(model):
+    from utils.explain import catboost_explainer
+    return catboost_explainer(model)
+
+
+def _forest_explainer(forest):
+    from utils.artifacts import forest_explainer
+    return forest_explainer(forest)
+
+
+def _forest_fast_explainer(forest):
+    from utils.compiled_forest import PathAttributionExplainer
+    return PathAttributionExplainer(forest)
+
+
+# 다른 아티팩트로부터 만들어지는 객체: 이름 -> (원본 이름, 생성 함수)
+DERIVED = {
+    "caa_explainer": ("caa_model", _catboost_explainer),
+    "ivig_explainer": ("ivig_model", _forest_explainer),
+    # 근사 설명 (Saabas path attribution): 서버가 바쁠 때 사용
+    "ivig_fast_explainer": ("ivig_model", _forest_fast_explainer),
+}
+
+
+def current_rss_bytes():
+    """Return the resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # /proc 가 없는 환경 (macOS 등): 최대 RSS 로 대체
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_artifact(path):
+    """Load a packaged model from the path of its manifest (checksums verified, no pickle)"""
+    from utils.artifacts import load_artifact as load_packaged
+    return load_packaged(os.path.dirname(path))
+
+
+class _Entry:
+    def __init__(self, obj, stamp, sha256, load_seconds, rss_delta):
+        self.obj = obj
+        self.stamp = stamp
+        self.sha256 = sha256
+        self.load_seconds = load_seconds
+        self.rss_delta = rss_delta
+        self.loaded_at = time.time()
+
+
+class ModelRegistry:
+    """Process-wide registry that loads each model artifact once.
+
+    Entries are keyed by file path and (mtime, size). An artifact is loaded
+    lazily on first access and reloaded when the file on disk changes.
+    Derived entries (e.g. an explainer built from a model) are rebuilt
+    whenever their source artifact changes.
+    """
+
+    def __init__(self, paths=None, loader=load_artifact, derived=None):
+        self.paths = dict(MODEL_PATHS if paths is None else paths)
+        self.derived = dict(DERIVED if derived is None else derived)
+        self.loader = loader
+        self._entries = {}
+        self._reloads = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """Call ``callback(name, sha256)`` whenever an artifact is (re)loaded"""
+        self._listeners.append(callback)
+
+    def _notify(self, name, sha256):
+        for callback in self._listeners:
+            callback(name, sha256)
+
+    def _lock_for(self, name):
+        with self._guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name):
+        """Return the loaded object for ``name``, loading or reloading it if needed"""
+        if name in self.derived:
+            return self._get_derived(name)
+
+        path = self.paths[name]
+        st = os.stat(path)
+        stamp = (path, st.st_mtime_ns, st.st_size)
+
+        entry = self._entries.get(name)
+        if entry is not None and entry.stamp == stamp:
+            return entry.obj
+
+        with self._lock_for(name):
+            # 다른 스레드가 이미 로드했을 수 있으므로 다시 확인
+            entry = self._entries.get(name)
+            if entry is not None and entry.stamp == stamp:
+                return entry.obj
+
+            sha256 = file_sha256(path)
+            if entry is not None and entry.sha256 == sha256:
+                # 내용은 같고 mtime 만 바뀐 경우: 다시 로드하지 않음
+                entry.stamp = stamp
+                return entry.obj
+
+            rss_before = current_rss_bytes()
+            start = time.perf_counter()
+            obj = self.loader(path)
+            load_seconds = time.perf_counter() - start
+            rss_delta = max(current_rss_bytes() - rss_before, 0)
+
+            if entry is not None:
+                self._reloads[name] = self._reloads.get(name, 0) + 1
+            self._entries[name] = _Entry(obj, stamp, sha256, load_seconds, rss_delta)
+        self._notify(name, sha256)
+        return obj
+
+    def _get_derived(self, name):
+        source_name, factory = self.derived[name]
+        source = self.get(source_name)
+        stamp = self.fingerprint(source_name)
+
+        entry = self._entries.get(name)
+        if entry is not None and entry.stamp == stamp:
+            return entry.obj
+
+        with self._lock_for(name):
+            entry = self._entries.get(name)
+            if entry is not None and entry.stamp == stamp:
+                return entry.obj
+
+            rss_before = current_rss_bytes()
+            start = time.perf_counter()
+            obj = factory(source)
+            load_seconds = time.perf_counter() - start
+            rss_delta = max(current_rss_bytes() - rss_before, 0)
+
+            if entry is not None:
+                self._reloads[name] = self._reloads.get(name, 0) + 1
+            self._entries[name] = _Entry(obj, stamp, stamp, load_seconds, rss_delta)
+        self._notify(name, stamp)
+        return obj
+
+    def fingerprint(self, name):
+        """Return the content hash of a loaded artifact, or None if not loaded.
+
+        Derived artifacts report the hash of their source, so cached results
+        can be looked up without building the explainer first.
+        """
+        if name in self.derived:
+            name = self.derived[name][0]
+        entry = self._entries.get(name)
+        return entry.sha256 if entry is not None else None
+
+    def is_loaded(self, name):
+        return name in self._entries
+
+    def stats(self):
+        """Return load time and memory figures for every known artifact"""
+        rows = []
+        names = list(self.paths) + list(self.derived)
+        for name in names:
+            path = self.paths.get(name) or f"<{self.derived[name][0]}>"
+            entry = self._entries.get(name)
+            rows.append({
+                "name": name,
+                "path": path,
+                "loaded": entry is not None,
+                "load_seconds": entry.load_seconds if entry else None,
+                "rss_mb": entry.rss_delta / 2**20 if entry else None,
+                "sha256": entry.sha256[:12] if entry else None,
+                "loaded_at": entry.loaded_at if entry else None,
+                "reloads": self._reloads.get(name, 0),
+            })
+        return rows
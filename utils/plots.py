@@ -0,0 +1,379 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.risk import HIGH_RISK_THRESHOLD, MODERATE_RISK_THRESHOLD
+
+
+# SHAP 기본 색상
+POSITIVE_COLOR = "#ff0051"
+NEGATIVE_COLOR = "#008bfb"
+
+# matplotlib 은 전역 상태(rcParams, pyplot 현재 figure)를 쓰므로 렌더링을 직렬화
+_matplotlib_lock = threading.Lock()
+
+
+class PlotCache:
+    """Thread-safe bounded LRU cache for rendered charts"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, render):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+
+        value = render()
+        with self._lock:
+            self._items[key] = value
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return value
+
+
+plot_cache = PlotCache()
+
+
+def plot_key(model_id, X, *parts):
+    """Cache key from a model identity, an input vector and chart options"""
+    digest = hashlib.sha256(str(model_id).encode())
+    digest.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    for part in parts:
+        digest.update(repr(part).encode())
+    return digest.hexdigest()
+
+
+def _format_value(value):
+    if isinstance(value, str):
+        return value
+    return f"{value:.3g}"
+
+
+def shap_frame(explanation, max_display):
+    """Top contributions of a single-row explanation, remaining features collapsed into one row"""
+    values = np.asarray(explanation.values, dtype=float)
+    data = explanation.data if explanation.data is not None else [None] * len(values)
+    names = explanation.feature_names or [f"Feature {i}" for i in range(len(values))]
+    labels = [name if d is None else f"{_format_value(d)} = {name}" for name, d in zip(names, data)]
+
+    order = np.argsort(-np.abs(values), kind="stable")
+    if len(order) > max_display:
+        keep, rest = order[:max_display - 1], order[max_display - 1:]
+        labels = [labels[i] for i in keep] + [f"{len(rest)} other features"]
+        values = np.append(values[keep], values[rest].sum())
+    else:
+        labels = [labels[i] for i in order]
+        values = values[order]
+
+    frame = pd.DataFrame({"feature": labels, "shap": values})
+    frame["rank"] = np.arange(len(frame))
+    frame["direction"] = np.where(frame["shap"] >= 0, "positive", "negative")
+    return frame
+
+
+def _color_encoding():
+    return {
+        "field": "direction",
+        "type": "nominal",
+        "scale": {"domain": ["positive", "negative"], "range": [POSITIVE_COLOR, NEGATIVE_COLOR]},
+        "legend": None,
+    }
+
+
+def _feature_encoding():
+    return {"field": "feature", "type": "nominal", "sort": {"field": "rank", "op": "min"}, "title": None}
+
+
+def _tooltip():
+    return [{"field": "feature", "type": "nominal"}, {"field": "shap", "type": "quantitative", "format": "+.4f"}]
+
+
+def waterfall_spec(explanation, max_display=15):
+    """Vega-Lite waterfall of a single-row explanation, largest contribution on top"""
+    frame = shap_frame(explanation, max_display)
+    base_value = float(np.ravel(explanation.base_values)[0])
+
+    # 가장 작은 기여도부터 base value 에 누적 (shap waterfall 과 같은 순서)
+    ends = base_value + frame["shap"].iloc[::-1].cumsum()
+    frame["end"] = ends.iloc[::-1].to_numpy()
+    frame["start"] = frame["end"] - frame["shap"]
+    frame["label_x"] = frame[["start", "end"]].max(axis=1)
+    frame["label"] = frame["shap"].map(lambda v: f"{v:+.3f}")
+    output = base_value + frame["shap"].sum()
+
+    return {
+        "data": {"values": frame.to_dict(orient="records")},
+        "height": max(28 * len(frame), 200),
+        "layer": [
+            {
+                "mark": "bar",
+                "encoding": {
+                    "y": _feature_encoding(),
+                    "x": {
+                        "field": "start",
+                        "type": "quantitative",
+                        "scale": {"zero": False},
+                        "title": f"E[f(X)] = {base_value:.3f}  →  f(x) = {output:.3f}",
+                    },
+                    "x2": {"field": "end"},
+                    "color": _color_encoding(),
+                    "tooltip": _tooltip(),
+                },
+            },
+            {
+                "mark": {"type": "text", "align": "left", "dx": 4},
+                "encoding": {
+                    "y": _feature_encoding(),
+                    "x": {"field": "label_x", "type": "quantitative"},
+                    "text": {"field": "label", "type": "nominal"},
+                },
+            },
+            {
+                "mark": {"type": "rule", "strokeDash": [4, 4], "color": "#888"},
+                "encoding": {"x": {"datum": base_value, "type": "quantitative"}},
+            },
+        ],
+    }
+
+
+def bar_spec(explanation, max_display=15):
+    """Vega-Lite bar chart of SHAP values for a single row"""
+    frame = shap_frame(explanation, max_display)
+    frame["label"] = frame["shap"].map(lambda v: f"{v:+.3f}")
+    encoding = {
+        "y": _feature_encoding(),
+        "x": {"field": "shap", "type": "quantitative", "title": "SHAP value"},
+    }
+    return {
+        "data": {"values": frame.to_dict(orient="records")},
+        "height": max(28 * len(frame), 200),
+        "layer": [
+            {"mark": "bar", "encoding": {**encoding, "color": _color_encoding(), "tooltip": _tooltip()}},
+            {
+                "mark": {"type": "text", "align": "left", "dx": 4},
+                "encoding": {**encoding, "text": {"field": "label", "type": "nominal"}},
+            },
+        ],
+    }
+
+
+def matplotlib_png(explanation, kind, max_display=15):
+    """Render shap.plots.waterfall / shap.plots.bar to PNG bytes (fallback backend)"""
+    import matplotlib.pyplot as plt
+    import shap
+
+    plot = shap.plots.waterfall if kind == "waterfall" else shap.plots.bar
+    with _matplotlib_lock, plt.rc_context({"font.size": 10}):
+        fig, _ = plt.subplots(figsize=(12, 8))
+        try:
+            plot(explanation, max_display=max_display, show=False)
+            plt.tight_layout()
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format="png", dpi=100)
+        finally:
+            plt.close(fig)
+    return buffer.getvalue()
+
+
+def _summary_order(mean_abs, max_display):
+    return np.argsort(-np.asarray(mean_abs), kind="stable")[:max_display]
+
+
+def mean_abs_spec(feature_names, mean_abs, max_display=15):
+    """Vega-Lite bar chart of mean |SHAP| per feature (global importance)"""
+    order = _summary_order(mean_abs, max_display)
+    frame = pd.DataFrame({
+        "feature": [feature_names[j] for j in order],
+        "mean_abs": np.asarray(mean_abs)[order],
+        "rank": np.arange(len(order)),
+    })
+    return {
+        "data": {"values": frame.to_dict(orient="records")},
+        "height": max(28 * len(frame), 200),
+        "mark": {"type": "bar", "color": POSITIVE_COLOR},
+        "encoding": {
+            "y": _feature_encoding(),
+            "x": {"field": "mean_abs", "type": "quantitative", "title": "mean(|SHAP value|)"},
+            "tooltip": [{"field": "feature", "type": "nominal"},
+                        {"field": "mean_abs", "type": "quantitative", "format": ".4f"}],
+        },
+    }
+
+
+def beeswarm_spec(feature_names, shap_values, data, mean_abs, max_display=15, seed=0):
+    """Vega-Lite beeswarm of sampled SHAP values, colored by the (rank-scaled) feature value"""
+    order = _summary_order(mean_abs, max_display)
+    shap_values = np.asarray(shap_values)[:, order]
+    data = np.asarray(data)[:, order]
+    n_rows, n_features = shap_values.shape
+
+    # shap.plots.beeswarm 처럼 5~95 백분위로 잘라 0~1 로 정규화
+    low, high = np.nanpercentile(data, [5, 95], axis=0) if n_rows else (np.zeros(n_features),) * 2
+    scaled = np.clip((data - low) / np.where(high > low, high - low, 1.0), 0.0, 1.0)
+    jitter = np.random.default_rng(seed).uniform(-1.0, 1.0, shap_values.shape)
+
+    frame = pd.DataFrame({
+        "feature": np.repeat([[feature_names[j] for j in order]], n_rows, axis=0).ravel(),
+        "rank": np.tile(np.arange(n_features), n_rows),
+        "shap": shap_values.ravel(),
+        "value": data.ravel(),
+        "scaled": scaled.ravel(),
+        "jitter": jitter.ravel(),
+    })
+    return {
+        "data": {"values": frame.to_dict(orient="records")},
+        "height": max(32 * n_features, 200),
+        "mark": {"type": "circle", "size": 12, "opacity": 0.6},
+        "encoding": {
+            "y": _feature_encoding(),
+            "yOffset": {"field": "jitter", "type": "quantitative", "scale": {"domain": [-3, 3]}},
+            "x": {"field": "shap", "type": "quantitative", "title": "SHAP value"},
+            "color": {
+                "field": "scaled",
+                "type": "quantitative",
+                "scale": {"range": [NEGATIVE_COLOR, POSITIVE_COLOR]},
+                "legend": {"title": "Feature value", "labelExpr": "datum.value == 0 ? 'Low' : datum.value == 1 ? 'High' : ''"},
+            },
+            "tooltip": [{"field": "feature", "type": "nominal"},
+                        {"field": "value", "type": "quantitative", "format": ".3g"},
+                        {"field": "shap", "type": "quantitative", "format": "+.4f"}],
+        },
+    }
+
+
+def dependence_spec(feature_name, values, shap_values):
+    """Vega-Lite scatter of one feature's value against its SHAP value"""
+    frame = pd.DataFrame({"value": np.asarray(values), "shap": np.asarray(shap_values)})
+    return {
+        "data": {"values": frame.to_dict(orient="records")},
+        "height": 320,
+        "layer": [
+            {
+                "mark": {"type": "circle", "size": 18, "opacity": 0.6, "color": NEGATIVE_COLOR},
+                "encoding": {
+                    "x": {"field": "value", "type": "quantitative", "title": feature_name, "scale": {"zero": False}},
+                    "y": {"field": "shap", "type": "quantitative", "title": f"SHAP value for {feature_name}"},
+                    "tooltip": [{"field": "value", "type": "quantitative", "format": ".3g"},
+                                {"field": "shap", "type": "quantitative", "format": "+.4f"}],
+                },
+            },
+            {
+                "mark": {"type": "rule", "strokeDash": [4, 4], "color": "#888"},
+                "encoding": {"y": {"datum": 0, "type": "quantitative"}},
+            },
+        ],
+    }
+
+
+def _probability_axis(field="probability"):
+    return {"field": field, "type": "quantitative", "title": "Predicted probability",
+            "scale": {"domain": [0, 1]}, "axis": {"format": ".0%"}}
+
+
+def _sweep_axis(field, title, labels):
+    # 범주형 변수는 코드 대신 표시 이름으로
+    if labels:
+        return {"field": f"{field}_label", "type": "nominal", "title": title, "sort": None}
+    return {"field": field, "type": "quantitative", "title": title, "scale": {"zero": False}}
+
+
+def _edges(values):
+    """Cell boundaries halfway between neighbouring grid values"""
+    values = np.asarray(values, dtype=float)
+    if len(values) == 1:
+        return values - 0.5, values + 0.5
+    mid = (values[1:] + values[:-1]) / 2
+    return np.r_[2 * values[0] - mid[0], mid], np.r_[mid, 2 * values[-1] - mid[-1]]
+
+
+def sensitivity_curve_spec(values, probability, current, title, labels=None):
+    """Vega-Lite risk curve over one feature; ``current`` is the patient's (value, probability)"""
+    frame = pd.DataFrame({"x": np.asarray(values, dtype=float), "probability": np.asarray(probability)})
+    point = {"x": current[0], "probability": current[1]}
+    if labels:
+        frame["x_label"] = frame["x"].map(lambda v: labels[int(v)])
+        point["x_label"] = labels[int(current[0])]
+    x = _sweep_axis("x", title, labels)
+    tooltip = [{"field": x["field"], "type": x["type"], "title": title},
+               {"field": "probability", "type": "quantitative", "format": ".1%"}]
+    return {
+        "height": 320,
+        "layer": [
+            {
+                "data": {"values": frame.to_dict(orient="records")},
+                "mark": {"type": "bar", "color": NEGATIVE_COLOR} if labels else {"type": "line", "color": NEGATIVE_COLOR},
+                "encoding": {"x": x, "y": _probability_axis(), "tooltip": tooltip},
+            },
+            {
+                "data": {"values": [{"threshold": MODERATE_RISK_THRESHOLD}, {"threshold": HIGH_RISK_THRESHOLD}]},
+                "mark": {"type": "rule", "strokeDash": [4, 4], "color": "#888"},
+                "encoding": {"y": {"field": "threshold", "type": "quantitative"}},
+            },
+            {
+                "data": {"values": [point]},
+                "mark": {"type": "point", "filled": True, "size": 90, "color": POSITIVE_COLOR},
+                "encoding": {"x": x, "y": _probability_axis(), "tooltip": tooltip},
+            },
+        ],
+    }
+
+
+def sensitivity_heatmap_spec(axes, probability, current, titles, labels=(None, None)):
+    """Vega-Lite heatmap over two features (rows: first, columns: second); ``current`` marks the patient"""
+    mesh = np.meshgrid(*[np.asarray(axis, dtype=float) for axis in axes], indexing="ij")
+    frame = pd.DataFrame({"y": mesh[0].ravel(), "x": mesh[1].ravel(), "probability": np.ravel(probability)})
+    point = {"y": current[0], "x": current[1]}
+    encoding, marker, tooltip = {}, {}, []
+    for field, axis, title, names in zip(("y", "x"), axes, titles, labels):
+        if names:
+            frame[f"{field}_label"] = frame[field].map(lambda v: names[int(v)])
+            point[f"{field}_label"] = names[int(point[field])]
+            encoding[field] = marker[field] = _sweep_axis(field, title, names)
+            tooltip.append({"field": f"{field}_label", "type": "nominal", "title": title})
+            continue
+        # 연속형 축은 격자 값 사이의 중간점을 칸 경계로 사용
+        start, end = _edges(axis)
+        index = np.searchsorted(np.asarray(axis, dtype=float), frame[field])
+        frame[f"{field}_start"], frame[f"{field}_end"] = start[index], end[index]
+        scale = {"zero": False, "nice": False}
+        encoding[field] = {"field": f"{field}_start", "type": "quantitative", "title": title, "scale": scale}
+        encoding[f"{field}2"] = {"field": f"{field}_end"}
+        marker[field] = {"field": field, "type": "quantitative", "scale": scale}
+        tooltip.append({"field": field, "type": "quantitative", "title": title, "format": ".3g"})
+    tooltip.append({"field": "probability", "type": "quantitative", "format": ".1%"})
+
+    return {
+        "height": 360,
+        "layer": [
+            {
+                "data": {"values": frame.to_dict(orient="records")},
+                "mark": "rect",
+                "encoding": {
+                    **encoding,
+                    "color": {
+                        "field": "probability", "type": "quantitative", "title": "Probability",
+                        "scale": {"domain": [0, 0.5, 1], "range": [NEGATIVE_COLOR, "#f5f5f5", POSITIVE_COLOR]},
+                        "legend": {"format": ".0%"},
+                    },
+                    "tooltip": tooltip,
+                },
+            },
+            {
+                "data": {"values": [point]},
+                "mark": {"type": "point", "shape": "cross", "filled": True, "size": 160, "color": "#111"},
+                "encoding": marker,
+            },
+        ],
+    }
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+DEFAULT_MAXSIZE = int(os.environ.get("KD_RESULT_CACHE_SIZE", 4096))
+DEFAULT_DB_PATH = os.environ.get("KD_RESULT_CACHE_DB")  # 설정하지 않으면 메모리 캐시만 사용
+CANONICAL_DECIMALS = 6
+
+
+def canonicalize(X, decimals=CANONICAL_DECIMALS):
+    """Round a feature frame so equal-looking inputs (3.3 vs 3.3000000000000003) are identical.
+
+    The rounded frame is what gets scored, so a cached result always matches
+    the input it is keyed by.
+    """
+    X = X.copy()
+    numeric = X.select_dtypes(include="float").columns
+    # -0.0 과 0.0 을 같은 값으로 취급
+    X[numeric] = X[numeric].round(decimals) + 0.0
+    return X
+
+
+class ResultCache:
+    """Bounded LRU of prediction/explanation results with an optional SQLite tier.
+
+    Keys combine the artifact name, the artifact's content hash and the
+    canonical feature vector, so results from a replaced model never hit.
+    ``invalidate`` drops stale entries when an artifact is reloaded.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, db_path=DEFAULT_DB_PATH):
+        self.maxsize = maxsize
+        self.db_path = db_path
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, artifact TEXT, fingerprint TEXT, payload TEXT, created REAL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(artifact, fingerprint, X, variant=None):
+        """``variant`` distinguishes different results for the same input (e.g. sweep settings)"""
+        head = f"{artifact}:{fingerprint}:{list(X.columns)}"
+        if variant is not None:
+            head += f":{variant}"
+        digest = hashlib.sha256(head.encode())
+        digest.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+        return digest.hexdigest()
+
+    def get(self, artifact, fingerprint, X, variant=None):
+        key = self.make_key(artifact, fingerprint, X, variant)
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key][1]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._store(key, artifact, fingerprint, value)
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def put(self, artifact, fingerprint, X, value, variant=None):
+        """Store a JSON-serializable result"""
+        key = self.make_key(artifact, fingerprint, X, variant)
+        with self._lock:
+            self._store(key, artifact, fingerprint, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                    (key, artifact, fingerprint, json.dumps(value), time.time()),
+                )
+                self._db.commit()
+
+    def _store(self, key, artifact, fingerprint, value):
+        self._items[key] = ((artifact, fingerprint), value)
+        self._items.move_to_end(key)
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def invalidate(self, artifact, keep_fingerprint=None):
+        """Drop entries of ``artifact`` whose fingerprint differs from ``keep_fingerprint``"""
+        with self._lock:
+            stale = [k for k, ((a, f), _) in self._items.items() if a == artifact and f != keep_fingerprint]
+            for key in stale:
+                del self._items[key]
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM results WHERE artifact = ? AND fingerprint IS NOT ?",
+                    (artifact, keep_fingerprint),
+                )
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            disk_entries = None
+            if self._db is not None:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._items),
+                "disk_entries": disk_entries,
+            }
+
+
+def probability_result(model, X):
+    """Cacheable positive-class probability of a single row"""
+    return {"probability": float(model.predict_proba(X)[0, 1])}
+
+
+def explanation_result(explainer, X):
+    """Cacheable positive-class SHAP values and base value of a single row"""
+    explanation = explainer(X)[0]
+    values = np.asarray(explanation.values)
+    base_value = np.ravel(explanation.base_values)
+    if values.ndim > 1:
+        # RandomForest 분류기는 클래스별 값을 반환하므로 양성 클래스만 저장
+        values, base_value = values[:, 1], base_value[1:]
+    return {"values": values.tolist(), "base_value": float(base_value[0])}
+
+
+def cached_probability(cache, artifact, fingerprint, X, model):
+    """Positive-class probability of a single canonical row, computed once per model version"""
+    result = cache.get(artifact, fingerprint, X)
+    if result is None:
+        result = probability_result(model, X)
+        cache.put(artifact, fingerprint, X, result)
+    return result["probability"]
+
+
+def cached_explanation(cache, artifact, fingerprint, X, explainer):
+    """Single-row, positive-class shap.Explanation, computed once per model version"""
+    import shap
+
+    result = cache.get(artifact, fingerprint, X)
+    if result is None:
+        result = explanation_result(explainer, X)
+        cache.put(artifact, fingerprint, X, result)
+
+    return shap.Explanation(
+        values=np.asarray(result["values"]),
+        base_values=result["base_value"],
+        data=X.to_numpy()[0],
+        feature_names=list(X.columns),
+    )
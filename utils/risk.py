@@ -0,0 +1,35 @@
+# 위험도 분류 기준 (docs/API.md 참조)
+HIGH_RISK_THRESHOLD = 0.7
+MODERATE_RISK_THRESHOLD = 0.3
+
+RISK_LEVELS = {
+    "caa": {
+        "high": ("High Risk", "High risk: Enhanced monitoring recommended"),
+        "moderate": ("Moderate Risk", "Moderate risk: Careful surveillance required"),
+        "low": ("Low Risk", "Low risk: Standard monitoring"),
+    },
+    "ivig": {
+        "high": ("High Risk", "High resistance likelihood: Consider alternative therapy"),
+        "moderate": ("Moderate Risk", "Moderate resistance risk: Enhanced monitoring advised"),
+        "low": ("Low Risk", "Low resistance probability: IVIG likely effective"),
+    },
+}
+
+
+def risk_category(prob):
+    """Return 'high', 'moderate' or 'low' for a predicted probability"""
+    if prob > HIGH_RISK_THRESHOLD:
+        return "high"
+    if prob > MODERATE_RISK_THRESHOLD:
+        return "moderate"
+    return "low"
+
+
+def assess_risk(model_name, prob):
+    """Return the API output dict (probability, risk_level, recommendation)"""
+    level, recommendation = RISK_LEVELS[model_name][risk_category(prob)]
+    return {
+        "probability": float(prob),
+        "risk_level": level,
+        "recommendation": recommendation,
+    }
@@ -0,0 +1,58 @@
+"""What-if sensitivity sweeps: how the risk moves when one or two inputs change.
+
+The current patient is held fixed and repeated over a grid of values of
+the chosen features (their schema range from ``utils/features.py``, or a
+narrower range picked on the page). The whole grid is scored with a single
+vectorized ``predict_proba`` call, giving a 1-D risk curve or a 2-D
+heatmap. Results are kept in the result cache keyed by the patient vector,
+the model version and the grid, so moving between features is a cache hit.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from utils.features import FEATURES, cast_categoricals
+
+
+CURVE_POINTS = 60
+HEATMAP_POINTS = 25
+
+
+def feature_axis(name, points, low=None, high=None):
+    """Grid values of one feature: every category, or ``points`` steps over the range"""
+    spec = FEATURES[name]
+    if spec.choices:
+        return np.array(sorted(spec.choices), dtype=float)
+    low = spec.low if low is None else low
+    high = spec.high if high is None else high
+    return np.linspace(low, high, points)
+
+
+def grid_frame(X, features, axes):
+    """The single row ``X`` repeated over every combination of ``axes`` (first feature varies slowest)"""
+    mesh = np.meshgrid(*axes, indexing="ij")
+    values = np.repeat(X.to_numpy(dtype=float)[:1], mesh[0].size, axis=0)
+    for name, grid in zip(features, mesh):
+        values[:, X.columns.get_loc(name)] = grid.ravel()
+    return cast_categoricals(pd.DataFrame(values, columns=X.columns))
+
+
+def sweep_result(model, X, features, axes):
+    """Cacheable positive-class probability over the grid, shaped like ``axes``"""
+    probability = model.predict_proba(grid_frame(X, features, axes))[:, 1]
+    return {
+        "features": list(features),
+        "axes": [np.asarray(axis).tolist() for axis in axes],
+        "probability": probability.reshape([len(axis) for axis in axes]).tolist(),
+    }
+
+
+def cached_sweep(cache, artifact, fingerprint, X, model, features, axes):
+    """Sweep of a single canonical row, computed once per model version and grid"""
+    variant = "sweep:" + json.dumps([list(features), [np.asarray(axis).tolist() for axis in axes]])
+    result = cache.get(artifact, fingerprint, X, variant)
+    if result is None:
+        result = sweep_result(model, X, features, axes)
+        cache.put(artifact, fingerprint, X, result, variant)
+    return result
@@ -0,0 +1,184 @@
+"""Append-only store of per-prediction SHAP vectors with running aggregates.
+
+Each prediction appends one row (SHAP values followed by the feature
+values) to a raw float64 log. Aggregates are updated in O(features) per
+row and read by the summary dashboard in constant time:
+
+* count, sum and sum of absolute values per feature (mean, mean |SHAP|)
+* a log-bucketed quantile sketch per feature (relative error ``SKETCH_ALPHA``)
+* a fixed-size reservoir sample of rows for beeswarm and dependence plots
+
+The aggregates are snapshotted to ``summary.npz`` every
+``SNAPSHOT_EVERY`` rows; on start-up the snapshot is loaded and only the
+log tail written after it is replayed.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+
+
+DEFAULT_STORE_DIR = os.environ.get("KD_SHAP_STORE_DIR", "data/shap_store")
+RESERVOIR_SIZE = 2000
+SNAPSHOT_EVERY = 256
+
+# DDSketch 형태의 로그 구간: |x| 가 SKETCH_MIN 미만이면 0 구간
+SKETCH_ALPHA = 0.01
+SKETCH_MIN = 1e-6
+SKETCH_MAX = 1e3
+_GAMMA = (1 + SKETCH_ALPHA) / (1 - SKETCH_ALPHA)
+_N_BINS = int(np.ceil(np.log(SKETCH_MAX / SKETCH_MIN) / np.log(_GAMMA))) + 1
+_BIN_VALUES = SKETCH_MIN * _GAMMA ** np.arange(_N_BINS) * 2 / (1 + _GAMMA)
+
+
+class ShapStore:
+    """Append-only SHAP log and running summary for one model"""
+
+    def __init__(self, directory, feature_names, reservoir_size=RESERVOIR_SIZE, seed=0):
+        self.directory = directory
+        self.feature_names = list(feature_names)
+        self.reservoir_size = reservoir_size
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng(seed)
+        self._log_path = os.path.join(directory, "log.f64")
+        self._snapshot_path = os.path.join(directory, "summary.npz")
+
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                stored = json.load(f)["feature_names"]
+            if stored != self.feature_names:
+                raise ValueError(f"SHAP store {directory} was written for different features: {stored}")
+        else:
+            with open(manifest_path, "w") as f:
+                json.dump({"feature_names": self.feature_names}, f, indent=2)
+
+        self._reset()
+        self._load()
+
+    @property
+    def n_features(self):
+        return len(self.feature_names)
+
+    def _reset(self):
+        k = self.n_features
+        self.count = 0
+        self._sum = np.zeros(k)
+        self._sum_abs = np.zeros(k)
+        self._sketch = np.zeros((k, 2 * _N_BINS + 1), dtype=np.int64)  # 음수 구간(역순) | 0 | 양수 구간
+        self._reservoir = np.empty((self.reservoir_size, 2 * k))
+        self._snapshot_count = 0
+
+    def _load(self):
+        if os.path.exists(self._snapshot_path):
+            with np.load(self._snapshot_path) as snapshot:
+                self.count = int(snapshot["count"])
+                self._sum = snapshot["sum"]
+                self._sum_abs = snapshot["sum_abs"]
+                self._sketch = snapshot["sketch"]
+                self._reservoir[:len(snapshot["reservoir"])] = snapshot["reservoir"]
+            self._snapshot_count = self.count
+
+        if os.path.exists(self._log_path):
+            # 스냅샷 이후에 기록된 행만 다시 반영 (마지막의 불완전한 행은 무시)
+            width = 2 * self.n_features
+            n_rows = os.path.getsize(self._log_path) // (8 * width)
+            if n_rows > self.count:
+                log = np.memmap(self._log_path, dtype=np.float64, mode="r", shape=(n_rows, width))
+                self._update(np.array(log[self.count:]))
+
+    def append(self, shap_values, data):
+        """Record one or more predictions: SHAP and feature values, shape (n, features)"""
+        shap_values = np.atleast_2d(np.asarray(shap_values, dtype=np.float64))
+        data = np.atleast_2d(np.asarray(data, dtype=np.float64))
+        rows = np.ascontiguousarray(np.hstack([shap_values, data]))
+        if rows.shape[1] != 2 * self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {shap_values.shape[1]}")
+
+        with self._lock:
+            with open(self._log_path, "ab") as f:
+                rows.tofile(f)
+            self._update(rows)
+            if self.count - self._snapshot_count >= SNAPSHOT_EVERY:
+                self._save_snapshot()
+
+    def _update(self, rows):
+        k = self.n_features
+        values = rows[:, :k]
+        self._sum += values.sum(axis=0)
+        self._sum_abs += np.abs(values).sum(axis=0)
+
+        columns = np.broadcast_to(np.arange(k), values.shape)
+        np.add.at(self._sketch, (columns, _sketch_index(values)), 1)
+
+        # Algorithm R: 지금까지의 모든 행에서 균등한 표본을 유지
+        positions = self.count + np.arange(len(rows))
+        slots = np.where(
+            positions < self.reservoir_size,
+            positions,
+            (self._rng.random(len(rows)) * (positions + 1)).astype(np.int64),
+        )
+        for row, slot in zip(rows[slots < self.reservoir_size], slots[slots < self.reservoir_size]):
+            self._reservoir[slot] = row
+        self.count += len(rows)
+
+    def _save_snapshot(self):
+        tmp_path = self._snapshot_path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            count=self.count,
+            sum=self._sum,
+            sum_abs=self._sum_abs,
+            sketch=self._sketch,
+            reservoir=self._reservoir[:min(self.count, self.reservoir_size)],
+        )
+        os.replace(tmp_path, self._snapshot_path)
+        self._snapshot_count = self.count
+
+    def flush(self):
+        with self._lock:
+            if self.count != self._snapshot_count:
+                self._save_snapshot()
+
+    def summary(self, quantiles=(0.05, 0.5, 0.95)):
+        """Per-feature aggregates; cost does not depend on the number of rows stored"""
+        with self._lock:
+            n = self.count
+            result = {
+                "count": n,
+                "feature_names": self.feature_names,
+                "mean": self._sum / n if n else np.zeros(self.n_features),
+                "mean_abs": self._sum_abs / n if n else np.zeros(self.n_features),
+                "quantiles": {q: _sketch_quantile(self._sketch, q) for q in quantiles},
+            }
+        return result
+
+    def sample(self):
+        """Reservoir sample of (shap_values, data), each shape (m, features)"""
+        with self._lock:
+            rows = self._reservoir[:min(self.count, self.reservoir_size)].copy()
+        return rows[:, :self.n_features], rows[:, self.n_features:]
+
+
+def _sketch_index(values):
+    magnitude = np.abs(values)
+    with np.errstate(divide="ignore"):
+        bins = np.ceil(np.log(magnitude / SKETCH_MIN) / np.log(_GAMMA))
+    bins = np.clip(np.nan_to_num(bins, nan=0.0, neginf=0.0), 0, _N_BINS - 1).astype(np.int64)
+    return np.where(
+        magnitude < SKETCH_MIN, _N_BINS,
+        np.where(values > 0, _N_BINS + 1 + bins, _N_BINS - 1 - bins),
+    )
+
+
+def _sketch_quantile(sketch, q):
+    counts = np.cumsum(sketch, axis=1)
+    total = counts[:, -1]
+    result = np.full(len(sketch), np.nan)
+    representative = np.concatenate([-_BIN_VALUES[::-1], [0.0], _BIN_VALUES])
+    for j in np.flatnonzero(total):
+        rank = q * (total[j] - 1)
+        result[j] = representative[np.searchsorted(counts[j], rank, side="right")]
+    return result
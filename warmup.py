@@ -0,0 +1,109 @@
+"""Pre-warm imports, model artifacts and JIT-compiled code paths.
+
+Run once at image build time (writes the matplotlib font cache and
+bytecode into the image, and fails the build on a broken artifact; only
+what is written to disk is kept):
+
+    python warmup.py
+
+The Streamlit app calls ``warm`` in a background thread after the first
+page has rendered, so the first prediction does not pay for importing
+shap/catboost, loading the model artifacts or numba compilation.
+Set ``KD_WARMUP=0`` to disable the in-process warm-up.
+
+``freeze`` (``gc.freeze``) is for long-lived processes that have not
+served any request yet: job-queue workers right after they preload their
+models (``utils.jobs``) and API workers at startup (``api.lifespan``). The
+Streamlit warm-up runs after the first page has rendered, so it does not
+freeze (it would also freeze that session's objects).
+"""
+import gc
+import importlib
+import os
+import sys
+import time
+
+
+HEAVY_MODULES = ("numpy", "pandas", "matplotlib.pyplot", "shap", "catboost")
+ENABLED = os.environ.get("KD_WARMUP", "1") != "0"
+
+
+def import_modules(modules=HEAVY_MODULES):
+    """Import each module and return {module: seconds}"""
+    timings = {}
+    for module in modules:
+        start = time.perf_counter()
+        importlib.import_module(module)
+        timings[module] = time.perf_counter() - start
+    return timings
+
+
+def example_patient(model_name):
+    """One in-range patient (midpoint of every schema range) as a model frame"""
+    from utils.features import FEATURES, FEATURE_ORDERS, cast_categoricals, to_model_frame
+
+    record = {}
+    for name in FEATURE_ORDERS[model_name]:
+        spec = FEATURES[name]
+        record[name] = min(spec.choices) if spec.choices else (spec.low + spec.high) / 2
+    return cast_categoricals(to_model_frame([record], FEATURE_ORDERS[model_name]))
+
+
+def warm_models(registry, explainers=True):
+    """Load every model (and explainer) and run one prediction and explanation each.
+
+    Returns {step: seconds}; a step that failed maps to the exception instead.
+    """
+    from utils.features import FEATURE_ORDERS
+
+    timings = {}
+    for model_name in FEATURE_ORDERS:
+        X = example_patient(model_name)
+        steps = [(f"{model_name}_model", lambda obj: obj.predict_proba(X))]
+        if explainers:
+            steps.append((f"{model_name}_explainer", lambda obj: obj(X)))
+        for name, call in steps:
+            start = time.perf_counter()
+            try:
+                call(registry.get(name))
+            except Exception as e:
+                timings[name] = e
+                continue
+            timings[name] = time.perf_counter() - start
+    return timings
+
+
+def warm(registry=None, explainers=True):
+    """Warm imports and models (explainers too unless ``explainers`` is False); returns {step: seconds or exception}"""
+    if registry is None:
+        from utils.model_registry import ModelRegistry
+        registry = ModelRegistry()
+    timings = import_modules()
+    timings.update(warm_models(registry, explainers))
+    return timings
+
+
+def freeze():
+    """Move every object alive now out of the garbage collector's reach"""
+    # 모듈과 모델은 프로세스가 끝날 때까지 유지되므로 GC 검사 대상에서 제외
+    # (이후 full collection 이 로드된 모델과 모듈 객체를 다시 훑지 않음)
+    gc.collect()
+    gc.freeze()
+
+
+def main():
+    start = time.perf_counter()
+    timings = warm()
+    failed = False
+    for step, result in timings.items():
+        if isinstance(result, Exception):
+            failed = True
+            print(f"❌ {step}: {result}")
+        else:
+            print(f"✅ {step}: {result * 1000:.0f} ms")
+    print(f"Warm-up finished in {time.perf_counter() - start:.1f} s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())